@@ -0,0 +1,174 @@
+"""
+Derived channel expressions, compiled from the Channel rows of the graph
+sheets and evaluated over whole columns.
+
+A graph sheet can define derived channels from the data file columns,
+one Channel row per channel with the channel name and expression as value:
+
+    Channel    speed = sqrt(velocity.w[0]**2 + velocity.w[1]**2)
+    Channel    heading = degrees(unwrap(yaw))
+    Channel    closing = -"Rel-speed" * 3.6
+
+The channel name is then used as xValue or yValue like any data column.
+
+Column names that are valid Python names, optionally followed by
+attributes and constant indices (velocity.w[0]), are used as is in the
+expression.  Other column names (e.g., with - or spaces) are quoted.
+The expression may use the arithmetic, comparison and bitwise operators,
+numbers, pi, e and the numpy functions listed in the functions dict.
+
+The expression is parsed once into a Python syntax tree, which is checked
+against the allowed nodes and names (so that a config file cannot run
+arbitrary code), the column references are replaced by variables and the
+tree is compiled.  The compiled expression is evaluated with whole numpy
+columns, not row by row.  For the rows appended to a followed data file
+only the new rows are evaluated, unless the expression uses a function
+of the other rows (unwrap, cumsum, gradient).
+
+This module requires numpy.
+"""
+
+import ast
+import functools
+import numpy as np
+
+# numpy functions that may be used in expressions, all keep the column length
+functions = {
+    'abs': np.abs, 'sign': np.sign, 'sqrt': np.sqrt, 'exp': np.exp,
+    'log': np.log, 'log10': np.log10, 'floor': np.floor, 'ceil': np.ceil,
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+    'arcsin': np.arcsin, 'arccos': np.arccos, 'arctan': np.arctan, 'arctan2': np.arctan2,
+    'hypot': np.hypot, 'degrees': np.degrees, 'radians': np.radians,
+    'unwrap': np.unwrap, 'minimum': np.minimum, 'maximum': np.maximum,
+    'where': np.where, 'cumsum': np.cumsum, 'gradient': np.gradient,
+}
+
+constants = {'pi': np.pi, 'e': np.e}
+
+# functions whose value in a row depends on the other rows
+cumulativeFunctions = {'unwrap', 'cumsum', 'gradient'}
+
+# syntax tree nodes allowed in an expression, after the column references are replaced
+allowedNodes = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call,
+                ast.Name, ast.Load, ast.Constant,
+                ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+                ast.USub, ast.UAdd, ast.Invert, ast.BitAnd, ast.BitOr, ast.BitXor,
+                ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+
+##########################################
+#
+def parseChannel(definition):
+    """Split a Channel config value into the channel name and expression
+
+    definition: 'name = expression'
+
+    returns: (name, expression) strings
+    """
+    name, sep, expression = str(definition).partition('=')
+    if not sep or not name.strip() or not expression.strip():
+        raise ValueError(f'Channel "{definition}" is not "name = expression"')
+    return name.strip(), expression.strip()
+
+##########################################
+#
+def columnName(node):
+    """The column name for a column reference node, or None if not a column reference
+
+    Names (not function or constant names), attributes and constant indices
+    of those (velocity.w[0]) and quoted strings are column references.
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Name):
+        return None if node.id in functions or node.id in constants else node.id
+    if isinstance(node, ast.Attribute):
+        return ast.unparse(node) if columnName(node.value) is not None else None
+    if isinstance(node, ast.Subscript):
+        index = node.slice
+        if (isinstance(index, ast.Constant) and isinstance(index.value, int)
+                and columnName(node.value) is not None):
+            return ast.unparse(node)
+    return None
+
+##########################################
+#
+class ColumnReferences(ast.NodeTransformer):
+    """Replaces the column references in a syntax tree by variables _c0, _c1, ...
+    """
+    def __init__(self):
+        self.columns = []
+
+    def visit(self, node):
+        name = columnName(node)
+        if name is None:
+            return self.generic_visit(node)
+        if name not in self.columns:
+            self.columns.append(name)
+        return ast.copy_location(ast.Name(id=f'_c{self.columns.index(name)}', ctx=ast.Load()), node)
+
+##########################################
+#
+class ChannelExpression:
+    """A compiled derived channel expression
+
+    expression: the expression text
+
+    Attributes: columns, the names of the data columns used
+                rowwise, True if the value in each row depends on that row only
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        try:
+            tree = ast.parse(expression, mode='eval')
+        except SyntaxError as err:
+            raise ValueError(f'Channel expression "{expression}": {err.msg}') from None
+
+        references = ColumnReferences()
+        tree = ast.fix_missing_locations(references.visit(tree))
+        self.columns = references.columns
+        names = set(functions) | set(constants) | {f'_c{i}' for i in range(len(self.columns))}
+
+        for node in ast.walk(tree):
+            if not isinstance(node, allowedNodes):
+                raise ValueError(f'Channel expression "{expression}": '
+                                 f'{type(node).__name__} is not allowed')
+            if isinstance(node, ast.Name) and node.id not in names:
+                raise ValueError(f'Channel expression "{expression}": {node.id} is not allowed')
+            if isinstance(node, ast.Call) and (node.keywords or not isinstance(node.func, ast.Name)
+                                               or node.func.id not in functions):
+                raise ValueError(f'Channel expression "{expression}": '
+                                 f'only {", ".join(functions)} may be called')
+            if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+                raise ValueError(f'Channel expression "{expression}": {node.value!r} is not allowed')
+
+        self.code = compile(tree, f'<channel {expression}>', 'eval')
+        self.rowwise = not any(isinstance(node, ast.Call) and node.func.id in cumulativeFunctions
+                               for node in ast.walk(tree))
+
+    def evaluate(self, df, rows=None):
+        """Evaluate the expression over whole columns
+
+        df: dataframe (or ColumnFrame, TailReader) with the columns used
+        rows: optional slice of the rows to evaluate, default all rows,
+              only for rowwise expressions
+
+        returns: numpy array with one value per row
+        """
+        namespace = dict(functions, **constants)
+        for i, column in enumerate(self.columns):
+            values = np.asarray(df[column])
+            namespace[f'_c{i}'] = values if rows is None else values[rows]
+        with np.errstate(all='ignore'):
+            values = eval(self.code, {'__builtins__': {}}, namespace)
+        # e.g., an expression without columns
+        numRows = len(df) if rows is None else len(range(len(df))[rows])
+        return np.broadcast_to(values, (numRows,)) if np.ndim(values) == 0 else np.asarray(values)
+
+##########################################
+#
+@functools.lru_cache(maxsize=1024)
+def channelExpression(expression):
+    """The compiled expression, compiled once for each expression text
+    """
+    return ChannelExpression(expression)
@@ -0,0 +1,132 @@
+"""
+Streaming statistics of the plotted lines, for the Statistics tab of
+pyqt-dash-lineplot.py.
+
+The statistics table shows the count, min, max, mean, standard deviation
+and percentiles of each plotted line.  Computing these with pandas
+(df.describe()) makes temporary copies of the whole data file, which
+doubles the memory used for large files.  Here the columns are read in
+chunks of rows and each chunk is merged into running statistics, so
+that the extra memory is one chunk.  For memory mapped columns only one
+chunk at a time is read from disk.
+
+The mean and variance are merged with the pairwise formula of Chan et al.
+(Welford's update for chunks instead of single values), which is exact
+and numerically stable.  The percentiles are estimated from a uniform
+random sample of sampleSize values: each value gets a random key and the
+values with the smallest keys are kept (bottom-k sampling), which is
+mergeable chunk by chunk without Python loops over the values.  Files
+with fewer values than sampleSize get exact percentiles.
+
+The running statistics are updated with the rows appended to a followed 
+data file without reading the earlier rows again.  The summary of each 
+line is a dict of numbers, which is JSON serializable and kept in the 
+DataCache with the parsed columns.
+
+This module requires numpy.
+"""
+
+import numpy as np
+
+# the percentiles in the summary
+percentiles = [1, 5, 25, 50, 75, 95, 99]
+
+##########################################
+#
+class StreamingStats:
+    """Running statistics of one channel, updated one chunk at a time
+
+    sampleSize: the number of values kept for the percentiles
+    seed: seed of the random sample keys, for repeatable percentiles
+    """
+
+    def __init__(self, sampleSize=10000, seed=0):
+        self.sampleSize = sampleSize
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        self.nans = 0
+        self.mean = 0.
+        self.m2 = 0.
+        self.min = np.inf
+        self.max = -np.inf
+        self.sampleKeys = np.empty(0)
+        self.sampleValues = np.empty(0)
+
+    def update(self, values):
+        """Merge a chunk of values into the statistics
+
+        values: numpy array with the chunk of the channel
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        finite = values[~np.isnan(values)]
+        self.nans = self.nans + len(values) - len(finite)
+        numValues = len(finite)
+        if numValues == 0:
+            return
+
+        # pairwise merge of the chunk's mean and sum of squared deviations
+        chunkMean = finite.mean()
+        chunkM2 = np.square(finite - chunkMean).sum()
+        total = self.count + numValues
+        delta = chunkMean - self.mean
+        self.mean = self.mean + delta * numValues / total
+        self.m2 = self.m2 + chunkM2 + delta * delta * self.count * numValues / total
+        self.count = total
+        self.min = min(self.min, finite.min())
+        self.max = max(self.max, finite.max())
+
+        # keep the values with the smallest random keys
+        keys = np.concatenate([self.sampleKeys, self.rng.random(numValues)])
+        values = np.concatenate([self.sampleValues, finite])
+        if len(keys) > self.sampleSize:
+            keep = np.argpartition(keys, self.sampleSize)[:self.sampleSize]
+            keys = keys[keep]
+            values = values[keep]
+        self.sampleKeys = keys
+        self.sampleValues = values
+
+    def updateRows(self, values, chunkRows=1048576):
+        """Merge the values in chunks of rows, the temporary arrays are one chunk
+
+        values: numpy array with the rows of the channel
+        chunkRows: the number of rows in a chunk
+        """
+        for start in range(0, len(values), chunkRows):
+            self.update(values[start:start + chunkRows])
+
+    def summary(self):
+        """The statistics as dict of numbers, None for statistics without values
+        """
+        summary = {'count': int(self.count), 'nans': int(self.nans),
+                   'min': None, 'max': None, 'mean': None, 'std': None}
+        summary.update({f'p{p}': None for p in percentiles})
+        if self.count == 0:
+            return summary
+
+        summary.update(min=float(self.min), max=float(self.max), mean=float(self.mean),
+                       std=float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else 0.)
+        for p, value in zip(percentiles, np.percentile(self.sampleValues, percentiles)):
+            summary[f'p{p}'] = float(value)
+        return summary
+
+##########################################
+#
+def columnStats(df, columns, chunkRows=1048576, sampleSize=10000):
+    """Statistics of data columns, read in chunks of rows
+
+    df: dataframe, ColumnFrame or TailReader with the columns
+    columns: the names of the columns, columns that are not numeric are skipped
+    chunkRows: the number of rows in a chunk
+    sampleSize: the number of values kept for the percentiles of each column
+
+    returns: dict with the column name as key and the summary dict as value
+    """
+    stats = {}
+    for column in columns:
+        values = np.asarray(df[column])
+        if values.dtype.kind not in 'biuf':
+            continue
+        running = StreamingStats(sampleSize)
+        running.updateRows(values, chunkRows)
+        stats[column] = running.summary()
+    return stats
@@ -0,0 +1,270 @@
+"""
+Pre-serialized plotly figures shared by the pyqt-dash scripts.
+
+Dash serializes the figure dicts of all the graphs in a tab every time the
+tab is rendered, converting each numpy array to a list of numbers.  Here
+a figure is serialized once to JSON bytes, which are served as is.
+
+The line arrays are encoded as plotly typed arrays, a dict with the array
+dtype and the array bytes in base64 ({'dtype': 'f8', 'bdata': '...'}),
+which is smaller and much faster to encode and decode than a list of
+numbers.  Typed arrays require plotly.js 2.28 or later (dash 2.15 or later),
+set typedArrays to False for older versions.
+
+Float arrays are sent as float32 ('f4', half the bytes) where the
+precision allows, set per line with the precision:
+
+    auto: float32 if the float32 rounding error is at most autoTolerance
+    times the range of the values (far below a pixel), else float64.
+    float32: always float32, e.g., for lines with small variations on a
+    large offset where the rounding steps do not matter.
+    float64: never float32, e.g., for absolute times.
+
+The served figure JSON is compressed once for each content encoding
+(brotli if the brotli module is installed, gzip) and kept with the figure,
+see compressBody.  enableCompression compresses the other responses of
+the Dash server (layout, callbacks, scripts) with flask-compress.
+
+Figures written to html files reference a single plotly.min.js file in the
+same folder, instead of each file including its own copy of plotly.js.
+
+This module requires numpy, orjson is optional (plotly's JSON encoder is
+used otherwise), brotli and flask-compress are optional (figures are 
+compressed with gzip only, other responses are not compressed otherwise).
+"""
+
+import os
+import json
+import gzip
+import base64
+import hashlib
+import threading
+import numpy as np
+
+# encode numeric arrays as plotly typed arrays
+typedArrays = True
+
+# numpy dtypes supported by plotly.js typed arrays, other numeric types are converted
+typedDtypes = ['f8', 'f4', 'i4', 'u4', 'i2', 'u2', 'i1', 'u1']
+
+# float precisions of the typed arrays, the first one is the default
+precisions = ['auto', 'float32', 'float64']
+
+# largest float32 rounding error for auto precision, relative to the range of the values
+autoTolerance = 1e-5
+
+# content encodings of the served figures, in order of preference
+encodings = ['br', 'gzip']
+
+# compression levels, the figures are compressed once
+brotliQuality = 5
+gzipLevel = 6
+
+##########################################
+#
+def floatPrecision(values, precision='auto'):
+    """A float array as float32 if the precision allows, other arrays as they are
+
+    values: numpy array
+    precision: 'auto', 'float32' or 'float64'
+
+    returns: numpy array
+    """
+    if precision not in precisions:
+        raise ValueError(f'Unknown precision {precision}, use one of {", ".join(precisions)}')
+    if values.dtype.kind != 'f' or values.dtype.itemsize <= 4 or precision == 'float64':
+        return values
+
+    # values beyond the float32 range become inf
+    with np.errstate(over='ignore'):
+        narrow = values.astype(np.float32)
+    if precision == 'float32':
+        return narrow
+
+    finite = np.isfinite(values)
+    if not finite.any():
+        return narrow
+    span = values[finite].max() - values[finite].min()
+    error = np.abs(narrow[finite] - values[finite]).max()
+    return narrow if error <= autoTolerance * span else values
+
+##########################################
+#
+def typedArray(values, precision='auto'):
+    """A numpy array as plotly typed array
+
+    values: numpy array
+    precision: float precision, see floatPrecision
+
+    returns: dict with dtype and base64 bdata, or the array itself if not numeric
+    """
+    values = np.asarray(values)
+    if values.dtype.kind not in 'biuf':
+        return values
+    values = floatPrecision(values, precision)
+
+    dtype = values.dtype.str[1:]
+    if values.dtype.kind == 'b':
+        dtype = 'u1'
+    elif dtype not in typedDtypes:
+        # e.g., int64 or float16
+        dtype = 'f8'
+
+    # typed arrays are little endian
+    data = np.ascontiguousarray(values, dtype='<' + dtype)
+    return {'dtype': dtype, 'bdata': base64.b64encode(data.tobytes()).decode('ascii')}
+
+##########################################
+#
+def typedFigure(figdict, linePrecisions=None):
+    """Copy of a figure dict with the line x and y arrays as typed arrays
+
+    figdict: the figure dict, with numpy arrays for the line data
+    linePrecisions: optional list with the float precision of each line, default auto
+    """
+    data = []
+    for i, line in enumerate(figdict['data']):
+        line = dict(line)
+        precision = linePrecisions[i] if linePrecisions else precisions[0]
+        for axis in ['x', 'y']:
+            if isinstance(line.get(axis, None), np.ndarray):
+                line[axis] = typedArray(line[axis], precision)
+        data.append(line)
+    return dict(figdict, data=data)
+
+##########################################
+#
+def figureJSON(figdict, linePrecisions=None):
+    """Serialize a figure dict to JSON bytes
+
+    figdict: the figure dict, with numpy arrays for the line data
+    linePrecisions: optional list with the float precision of each line, see typedFigure
+
+    returns: bytes
+    """
+    if typedArrays:
+        figdict = typedFigure(figdict, linePrecisions)
+
+    try:
+        import orjson
+    except ImportError:
+        from plotly.utils import PlotlyJSONEncoder
+        return json.dumps(figdict, cls=PlotlyJSONEncoder).encode()
+
+    return orjson.dumps(figdict, option=orjson.OPT_SERIALIZE_NUMPY, default=jsonDefault)
+
+##########################################
+#
+def jsonDefault(value):
+    """Convert the values orjson does not serialize, e.g., numpy scalars and pandas objects
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f'{type(value)} is not JSON serializable')
+
+##########################################
+#
+def availableEncodings():
+    """The content encodings available here, brotli needs the brotli module
+    """
+    try:
+        import brotli
+    except ImportError:
+        return [encoding for encoding in encodings if encoding != 'br']
+    return encodings
+
+##########################################
+#
+def compressBody(body, encoding):
+    """Compress a response body for a content encoding
+
+    body: bytes
+    encoding: 'br' or 'gzip'
+
+    returns: bytes
+    """
+    if encoding == 'br':
+        import brotli
+        return brotli.compress(body, quality=brotliQuality)
+    return gzip.compress(body, compresslevel=gzipLevel)
+
+##########################################
+#
+def enableCompression(server):
+    """Compress the responses of a Flask server with flask-compress, if installed
+
+    Responses that already have a Content-Encoding (e.g., the compressed 
+    figures) are not compressed again.
+
+    server: the Flask app, e.g., app.server of a Dash app
+
+    returns: True if compression was enabled
+    """
+    try:
+        from flask_compress import Compress
+    except ImportError:
+        print('flask-compress is not installed, the responses are not compressed')
+        return False
+
+    server.config.setdefault('COMPRESS_ALGORITHM', availableEncodings())
+    server.config.setdefault('COMPRESS_BR_LEVEL', brotliQuality)
+    server.config.setdefault('COMPRESS_LEVEL', gzipLevel)
+    Compress(server)
+    return True
+
+##########################################
+#
+def figureKey(*parts):
+    """Hash of the parts (strings or bytes) that determine a figure, used as cache key
+
+    returns: hex digest string
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+##########################################
+#
+def writePlotlyJS(directory):
+    """Write plotly.min.js to a folder, for the html files written by writeFigureHTML
+
+    Write it before writing html files from several processes, 
+    so that the processes do not write it at the same time.
+    A plotly.min.js of another plotly.js version (e.g., after upgrading 
+    plotly) is replaced, the version is in its first comment.
+    """
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+    filename = os.path.join(directory, 'plotly.min.js')
+    try:
+        with open(filename, 'r', encoding='utf-8', errors='replace') as fin:
+            header = fin.read(256)
+    except OSError:
+        header = ''
+    if f'plotly.js v{get_plotlyjs_version()}\n' not in header:
+        tmpname = filename + f'.tmp{os.getpid()}-{threading.get_ident()}'
+        with open(tmpname, 'w', encoding='utf-8') as fout:
+            fout.write(get_plotlyjs())
+        os.replace(tmpname, filename)
+
+##########################################
+#
+def writeFigureHTML(figdict, filename):
+    """Write a figure to a html file, referencing plotly.min.js in the same folder
+
+    figdict: the figure dict
+    filename: the html file name
+    """
+    import plotly.offline as offline
+    directory = os.path.dirname(os.path.abspath(filename))
+    writePlotlyJS(directory)
+    # replace the file at once, e.g., a browser may be reading it
+    tmpname = os.path.join(directory, f'.tmp{os.getpid()}-{threading.get_ident()}-' 
+                                      + os.path.basename(filename))
+    offline.plot(figdict,
+        auto_open=False, include_plotlyjs='directory',
+        output_type='file', filename=tmpname, validate=False)
+    os.replace(tmpname, filename)
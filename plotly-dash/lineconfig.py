@@ -0,0 +1,261 @@
+"""
+Compiled graph sheet config shared by the pyqt-dash scripts.
+
+Each graph sheet in the Excel config file is read into a pandas dataframe
+with (at least) the Variable, Value, Scale, Offset, Linewidth, Colour, Dash,
+GraphType and LineLabel columns.  The scripts used to look up the Datafile,
+xValue etc. rows with boolean masks on the dataframe for every line in the
+graph, which is slow for graph sheets with many lines.
+
+compileSheet walks through the rows of a graph sheet once and returns a
+GraphSheet, with one GraphSpec for each Title in the sheet and one LineSpec
+for each yValue row.  A sheet without a Title row gets a single graph.
+A yValue row may give its own Datafile and xValue (time column in that 
+file, default the sheet's xValue) cells, for a line aligned from another 
+data file onto the sheet's x column (see timealign.py), and a Precision
+cell (auto, float32 or float64) for the float precision of its arrays 
+sent to the browser (see figurejson.py).
+The derived channels defined by Channel rows (see channelexpr.py) are kept 
+in GraphSheet.channels.  All other variables (GraphTop, ToDisk, MaxPoints, 
+...) are kept with their first value in GraphSheet.values.
+
+readConfigWorkbook reads all the sheets of the Excel config file in one
+pass and keeps them in a JSON sidecar file next to the config file, which
+is used instead of the Excel file for as long as the Excel file is unchanged.
+The sidecar holds only data (no pickle), so that a sidecar file written 
+by someone else cannot run code when read.
+
+This module requires numpy, pandas and openpyxl.
+"""
+
+import os
+import json
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+from channelexpr import parseChannel
+
+##########################################
+#
+def isGiven(value):
+    """Check if a config cell has a value, empty cells are read as NaN
+    """
+    if value is None:
+        return False
+    if isinstance(value, float):
+        return not np.isnan(value)
+    return True
+
+##########################################
+#
+def cellFloat(value, default):
+    """Config cell as float, or default if the cell is empty
+    """
+    return float(value) if isGiven(value) else default
+
+##########################################
+#
+def cellString(value, default=None):
+    """Config cell as string, or default if the cell is not a string
+    """
+    return value if isinstance(value, str) else default
+
+##########################################
+#
+@dataclass
+class LineSpec:
+    """One yValue line in a graph
+    """
+    __slots__ = ('column', 'scale', 'offset', 'width', 'colour', 'dash', 'graphtype', 'label',
+                 'datafile', 'xcolumn', 'precision')
+    column: str
+    scale: float
+    offset: float
+    width: float
+    colour: str
+    dash: str
+    graphtype: str
+    label: str
+    datafile: str
+    xcolumn: str
+    precision: str
+
+##########################################
+#
+@dataclass
+class GraphSpec:
+    """One graph (Title) in a graph sheet, with its lines
+    """
+    __slots__ = ('setStr', 'title', 'ylabel', 'lines')
+    setStr: str
+    title: str
+    ylabel: str
+    lines: list
+
+##########################################
+#
+@dataclass
+class GraphSheet:
+    """A compiled graph sheet, with the x-axis definition and all graphs
+    """
+    __slots__ = ('name', 'datafile', 'xcolumn', 'xscale', 'xoffset', 'xlabel',
+                 'height', 'graphs', 'channels', 'values')
+    name: str
+    datafile: str
+    xcolumn: str
+    xscale: float
+    xoffset: float
+    xlabel: str
+    height: str
+    graphs: list
+    channels: dict
+    values: dict
+
+    def value(self, variable, default=None):
+        """The value of an optional variable in the sheet, or default if not given
+        """
+        value = self.values.get(variable, None)
+        return value if isGiven(value) else default
+
+    def datafiles(self):
+        """The sheet's data file followed by the other data files of its lines
+        """
+        names = [self.datafile]
+        for graph in self.graphs:
+            for line in graph.lines:
+                if line.datafile is not None and line.datafile not in names:
+                    names.append(line.datafile)
+        return names
+
+##########################################
+#
+def compileSheet(dft, name):
+    """Compile a graph sheet dataframe into a GraphSheet
+
+    dft: the graph sheet dataframe, rows in the order of the sheet
+    name: the graph sheet name
+
+    returns: GraphSheet
+    """
+    sheet = GraphSheet(name=name, datafile=None, xcolumn=None, xscale=1.0, xoffset=0.,
+                       xlabel=None, height=None, graphs=[], channels={}, values={})
+
+    def cell(row, column):
+        return row[column] if column in row else None
+
+    def currentGraph():
+        # lines before the first Title go into the first graph
+        if not sheet.graphs:
+            sheet.graphs.append(GraphSpec(setStr='000', title=None, ylabel=None, lines=[]))
+        return sheet.graphs[-1]
+
+    for row in dft.to_dict('records'):
+        variable = row['Variable']
+        value = row['Value']
+
+        if variable == 'Title':
+            sheet.graphs.append(GraphSpec(setStr=f'{len(sheet.graphs):03d}', title=value,
+                                          ylabel=None, lines=[]))
+        elif variable == 'yLabel':
+            currentGraph().ylabel = value
+        elif variable == 'yValue':
+            currentGraph().lines.append(LineSpec(
+                column=value,
+                scale=cellFloat(cell(row, 'Scale'), 1.0),
+                offset=cellFloat(cell(row, 'Offset'), 0.),
+                width=cellFloat(cell(row, 'Linewidth'), None),
+                colour=cellString(cell(row, 'Colour')),
+                dash=cellString(cell(row, 'Dash')),
+                graphtype=cellString(cell(row, 'GraphType')),
+                label=cellString(cell(row, 'LineLabel'), value),
+                datafile=cellString(cell(row, 'Datafile')),
+                xcolumn=cellString(cell(row, 'xValue')),
+                precision=cellString(cell(row, 'Precision')),
+                ))
+        elif variable == 'xValue' and sheet.xcolumn is None:
+            sheet.xcolumn = value
+            sheet.xscale = cellFloat(cell(row, 'Scale'), 1.0)
+            sheet.xoffset = cellFloat(cell(row, 'Offset'), 0.)
+        elif variable == 'Datafile' and sheet.datafile is None:
+            sheet.datafile = value
+        elif variable == 'xLabel' and sheet.xlabel is None:
+            sheet.xlabel = value
+        elif variable == 'Height' and sheet.height is None:
+            sheet.height = value
+        elif variable == 'Channel':
+            channel, expression = parseChannel(value)
+            sheet.channels[channel] = expression
+        elif isinstance(variable, str):
+            sheet.values.setdefault(variable, value)
+
+    return sheet
+
+##########################################
+#
+def sheetToJSON(df):
+    """A config sheet as JSON serializable dict, in the layout of DataFrame.to_dict(orient='split')
+
+    The dtype of each column is kept, so that sheetFromJSON gives the same
+    dataframe as read from the workbook.
+    """
+    saved = df.to_dict(orient='split')
+    saved['dtypes'] = [str(dtype) for dtype in df.dtypes]
+    return saved
+
+##########################################
+#
+def sheetFromJSON(saved):
+    """The config sheet dataframe from the dict written by sheetToJSON
+    """
+    data = {}
+    for i, dtype in enumerate(saved['dtypes']):
+        values = pd.Series([row[i] for row in saved['data']], index=saved['index'], dtype=object)
+        data[i] = values if dtype == 'object' else values.astype(dtype)
+    df = pd.DataFrame(data, index=pd.Index(saved['index']))
+    df.columns = saved['columns']
+    return df
+
+##########################################
+#
+def readConfigWorkbook(configfile, sidecar=True):
+    """Read all the sheets in the Excel config file
+
+    The JSON sidecar is only written if the sheets read back from it are 
+    the same as read from the workbook (e.g., not for date cells).
+
+    configfile: the Excel config file name
+    sidecar: if True use (and update) the JSON sidecar file configfile+'.json'
+
+    returns: dict with sheet name as key and dataframe as value, in workbook order
+    """
+    stat = os.stat(configfile)
+    sidecarname = configfile + '.json'
+
+    if sidecar and os.path.exists(sidecarname):
+        try:
+            with open(sidecarname, 'r', encoding='utf-8') as fin:
+                saved = json.load(fin)
+            if saved['mtime'] == stat.st_mtime and saved['size'] == stat.st_size:
+                return {name: sheetFromJSON(sheet) for name, sheet in saved['sheets']}
+        except Exception:
+            # unreadable sidecar (e.g., partly written by an old version), read the workbook
+            pass
+
+    # all the sheets in a single pass through the workbook
+    sheets = pd.read_excel(configfile, sheet_name=None)
+
+    if sidecar:
+        try:
+            saved = [(name, sheetToJSON(df)) for name, df in sheets.items()]
+            if all(sheetFromJSON(sheet).equals(sheets[name]) for name, sheet in saved):
+                tmpname = sidecarname + f'.tmp{os.getpid()}'
+                with open(tmpname, 'w', encoding='utf-8') as fout:
+                    json.dump({'mtime': stat.st_mtime, 'size': stat.st_size, 'sheets': saved}, fout)
+                os.replace(tmpname, sidecarname)
+        except (OSError, TypeError, ValueError):
+            # e.g., read-only config folder or cells that JSON cannot hold, 
+            # just don't keep the sidecar
+            pass
+
+    return sheets
@@ -0,0 +1,612 @@
+"""
+
+This script benchmarks the data handling steps used by the pyqt-dash scripts.
+
+Each benchmark is a separate command, run one at a time:
+
+csvread: compares the original regular expression separator reader
+(sep="\\s+|,|;", engine='python') with the separator sniffing reader in
+telemetryio.py.  The bundled tp05j2a_*.traj files are scaled up by
+repeating their data rows --scale times and written to --workdir.
+The scaled files are kept for subsequent runs and must be removed manually.
+
+zoom: times the zoom callback's data step, selecting the zoomed x range
+and decimating it, on a synthetic line with --samples samples.  The range
+is selected with a boolean mask and with a binary search on the sorted x.
+
+config: compares the per-line dataframe lookups that makeGraphSet used
+to do with compiling the graph sheet once (lineconfig.py), on a synthetic
+graph sheet with --lines lines.
+
+matread: compares the original matlab file loader (loadmat on the whole
+file, dataframe from the full matrix) with readMatFile in telemetryio.py, 
+on synthetic GTV files of --megabytes MB in --workdir, in matlab v5 and
+v7.3 (HDF5) format.  Matlab v5 files cannot hold more than 2 GB, so the
+v5 file is only written for smaller sizes.  Each load runs in a new
+process, to measure the load time and the increase in peak memory (RSS).
+
+webgl: writes a page (webgl-benchmark.html in --workdir) that measures
+the time the browser takes to draw a line with --points points 
+(comma separated list) as SVG scatter and as WebGL scattergl trace.  
+Open the page in the browser to be measured, or use --show to open it 
+in a QtWebEngine window as used by the pyqt-dash viewers.
+
+expr: compares evaluating derived channel expressions (channelexpr.py)
+over whole columns with per-row pandas apply, on a synthetic data frame 
+with --rows rows.
+
+payload: compares the size of the figure JSON sent to the browser, raw
+and compressed (gzip, and brotli if installed), with the line arrays as
+JSON lists of numbers (as Dash sends numpy arrays) and as typed arrays 
+in float64, auto and float32 precision (figurejson.py).  The figures 
+have all columns of the bundled data files as lines against the first 
+column.  The decode time is measured in Python (JSON parsing and base64 
+decoding), as an indication of the work in the browser, and the error is 
+the largest difference from the data relative to the range of each line.
+
+This script requires numpy, pandas and docopt; pyarrow is optional.
+The matread command requires scipy and h5py, the webgl command plotly 
+(and PyQt5 for --show).
+
+"""
+
+import sys, os
+import time
+import math
+import json
+import base64
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from telemetryio import readDataFile, readMatFile
+from tracetools import decimateIndices, rangeIndices
+from lineconfig import compileSheet
+from channelexpr import channelExpression
+import figurejson
+
+##########################################
+#
+def scaleDataFile(datafilename, workdir, scale):
+    """Write a copy of a data file with the data rows repeated scale times
+
+    datafilename: the file to be scaled
+    workdir: the folder where the scaled file is written
+    scale: the number of times the data rows are repeated
+
+    returns: the scaled filename
+    """
+    outname = os.path.join(workdir, f'{scale}x-' + os.path.basename(datafilename))
+    if os.path.exists(outname):
+        return outname
+
+    with open(datafilename, 'r') as fin:
+        header = fin.readline()
+        body = fin.read()
+    if not body.endswith('\n'):
+        body = body + '\n'
+
+    with open(outname, 'w') as fout:
+        fout.write(header)
+        for i in range(scale):
+            fout.write(body)
+    return outname
+
+##########################################
+#
+def timeit(func, repeat=1):
+    """Time a function call, returns the best time and the last result
+    """
+    times = []
+    for i in range(repeat):
+        tstart = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - tstart)
+    return min(times), result
+
+##########################################
+#
+def benchCSVRead(workdir, scale):
+    """Compare the regex separator reader with the sniffing reader
+    """
+    datafilenames = ['data/tp05j2a_Moving0.traj', 'data/tp05j2a_Observer0.traj']
+
+    print(f'{"file":40s} {"MB":>8s} {"rows":>10s} {"regex [s]":>10s} {"sniff [s]":>10s} {"speedup":>8s}')
+    for datafilename in datafilenames:
+        scaledname = scaleDataFile(datafilename, workdir, scale)
+        size = os.path.getsize(scaledname) / 1e6
+
+        tregex, dfregex = timeit(lambda: pd.read_csv(scaledname, sep="\\s+|,|;",
+                                                    index_col=None, engine='python'))
+        tsniff, dfsniff = timeit(lambda: readDataFile(scaledname))
+
+        # the two readers must agree
+        assert list(dfregex.columns) == list(dfsniff.columns)
+        assert np.allclose(dfregex.values, dfsniff.values, equal_nan=True)
+
+        print(f'{os.path.basename(scaledname):40s} {size:8.1f} {dfsniff.shape[0]:10d} '
+              f'{tregex:10.2f} {tsniff:10.2f} {tregex/tsniff:8.1f}')
+
+##########################################
+#
+def benchZoom(numSamples, maxPoints):
+    """Time the zoom step: select the zoomed range and decimate it
+    """
+    x = np.linspace(0., 1000., numSamples)
+    y = np.sin(x) + 0.1 * np.random.randn(numSamples)
+
+    print(f'{numSamples} samples, {maxPoints} points per line')
+    print(f'{"zoom range":>12s} {"mask [ms]":>10s} {"search [ms]":>12s} {"samples":>10s}')
+    for width in [1000., 100., 10., 1., 0.1]:
+        xmin = 500. - width / 2
+        xmax = 500. + width / 2
+        def zoomStep(isSorted):
+            select = rangeIndices(x, xmin, xmax, isSorted)
+            return decimateIndices(x[select], y[select], maxPoints, 'lttb')
+
+        times = []
+        for isSorted in [False, True]:
+            dt, indices = timeit(lambda: zoomStep(isSorted), repeat=3)
+            times.append(dt)
+        numInRange = len(x[rangeIndices(x, xmin, xmax, True)])
+        print(f'{width:12.1f} {1000*times[0]:10.1f} {1000*times[1]:12.1f} {numInRange:10d}')
+
+##########################################
+#
+def makeConfigSheet(numLines, linesPerGraph=10):
+    """Synthetic graph sheet dataframe, indexed as in loadConfig
+    """
+    rows = [('Datafile', 'data/tp05j2a_Observer0.traj'), ('xValue', '%CurrentSimTime'),
+            ('xLabel', 'Time [s]'), ('Height', '400px')]
+    for i in range(numLines):
+        if i % linesPerGraph == 0:
+            rows.append(('Title', f'Graph {i // linesPerGraph}'))
+            rows.append(('yLabel', 'Value'))
+        rows.append(('yValue', f'position.w[{i % 3}]'))
+
+    dft = pd.DataFrame(rows, columns=['Variable', 'Value'])
+    for column in ['Scale', 'Offset', 'Linewidth']:
+        dft[column] = np.nan
+    for column in ['Colour', 'Dash', 'GraphType', 'LineLabel']:
+        dft[column] = None
+    dft['Graph'] = 'graph-bench'
+
+    # the Index column as made by loadConfig
+    theSet = (dft['Variable'] == 'Title').cumsum() - 1
+    line = dft[dft['Variable'] == 'yValue'].groupby(theSet).cumcount()
+    dft['Index'] = dft['Variable']
+    dft.loc[dft['Variable'].isin(['Title', 'yLabel']), 'Index'] = dft['Variable'] + '#' + theSet.map('{:03d}'.format)
+    dft.loc[line.index, 'Index'] = dft['Variable'] + '#' + theSet.map('{:03d}'.format) + '-' + line.map('{:03d}'.format)
+    return dft.set_index('Index')
+
+##########################################
+#
+def legacyConfigLookups(dft):
+    """The per-line config lookups done by makeGraphSet before lineconfig.py
+    """
+    specs = []
+    for index,row in dft[(dft['Variable']=='yValue')].iterrows():
+        dfilename = dft[(dft['Variable']=='Datafile')]['Value'].values[0]
+        yscale = row['Scale'] if not np.isnan(row['Scale']) else 1.0
+        xscale = dft[(dft['Variable']=='xValue')]['Scale'].values[0]
+        xscale = float(xscale) if not np.isnan(xscale) else 1.0
+        yoffset = row['Offset'] if not np.isnan(row['Offset']) else 0.
+        xoffset = dft[(dft['Variable']=='xValue')]['Offset'].values[0]
+        xoffset = float(xoffset) if not np.isnan(xoffset) else 0.
+        xcolumn = dft[(dft['Variable']=='xValue')].loc['xValue','Value']
+        specs.append((dfilename, xcolumn, xscale, xoffset, row['Value'], yscale, yoffset))
+
+    # matching lines to graphs by index name
+    for index,row in dft[(dft['Variable']=='Title')].iterrows():
+        setStr = str(index).split('#')[1]
+        lines = [spec for spec, key in zip(specs, dft[(dft['Variable']=='yValue')].index)
+                 if 'yValue#'+setStr in key]
+    return specs
+
+##########################################
+#
+def benchConfig(numLines):
+    """Compare the per-line dataframe lookups with the compiled graph sheet
+    """
+    dft = makeConfigSheet(numLines)
+    tlegacy, specs = timeit(lambda: legacyConfigLookups(dft), repeat=3)
+    tcompile, sheet = timeit(lambda: compileSheet(dft, 'graph-bench'), repeat=3)
+    assert len(specs) == sum(len(graph.lines) for graph in sheet.graphs)
+
+    print(f'{numLines} lines in {len(sheet.graphs)} graphs')
+    print(f'per-line lookups {1000*tlegacy:10.1f} ms')
+    print(f'compileSheet     {1000*tcompile:10.1f} ms')
+    print(f'speedup          {tlegacy/tcompile:10.1f}')
+
+##########################################
+#
+def benchExpr(numRows):
+    """Compare the compiled channel expressions with per-row pandas apply
+    """
+    t = np.arange(numRows) * 1e-3
+    df = pd.DataFrame({'%CurrentSimTime': t,
+                       'velocity.w[0]': 200. * np.cos(t),
+                       'velocity.w[1]': 200. * np.sin(t),
+                       'Rel-speed': 175. - t})
+
+    # expression and the same computation for one row
+    expressions = [
+        ('sqrt(velocity.w[0]**2 + velocity.w[1]**2)',
+         lambda row: math.sqrt(row['velocity.w[0]']**2 + row['velocity.w[1]']**2)),
+        ('degrees(arctan2(velocity.w[1], velocity.w[0]))',
+         lambda row: math.degrees(math.atan2(row['velocity.w[1]'], row['velocity.w[0]']))),
+        ('-"Rel-speed" * 3.6',
+         lambda row: -row['Rel-speed'] * 3.6),
+    ]
+
+    print(f'{numRows} rows')
+    print(f'{"expression":50s} {"apply [ms]":>11s} {"compile [ms]":>13s} {"eval [ms]":>10s} {"speedup":>8s}')
+    for expression, rowFunction in expressions:
+        tapply, applied = timeit(lambda: df.apply(rowFunction, axis=1))
+        channelExpression.cache_clear()
+        tcompile, compiled = timeit(lambda: channelExpression(expression))
+        teval, values = timeit(lambda: compiled.evaluate(df), repeat=3)
+
+        # the two must agree
+        assert np.allclose(applied.values, values)
+
+        print(f'{expression[:50]:50s} {1000*tapply:11.1f} {1000*tcompile:13.3f} {1000*teval:10.2f} '
+              f'{tapply/(tcompile + teval):8.0f}')
+
+##########################################
+#
+def payloadFigure(df):
+    """Figure dict with all numeric columns of a data file as lines against the first column
+    """
+    x = df[df.columns[0]].values.astype(float)
+    data = [{'x': x, 'y': df[column].values, 'name': column} for column in df.columns[1:]
+            if df[column].dtype.kind in 'biuf']
+    return {'layout': {'title': 'payload'}, 'data': data}
+
+##########################################
+#
+def decodePayload(body):
+    """Parse figure JSON and decode the line arrays to numpy arrays, as the browser does
+    """
+    figdict = json.loads(body)
+    for line in figdict['data']:
+        for axis in ['x', 'y']:
+            values = line[axis]
+            if isinstance(values, dict):
+                line[axis] = np.frombuffer(base64.b64decode(values['bdata']), dtype=values['dtype'])
+            else:
+                line[axis] = np.array(values, dtype=float)
+    return figdict
+
+##########################################
+#
+def payloadError(figdict, decoded):
+    """Largest difference between the decoded and original line arrays, relative to their range
+    """
+    error = 0.
+    for line, decodedLine in zip(figdict['data'], decoded['data']):
+        for axis in ['x', 'y']:
+            values = np.asarray(line[axis], dtype=float)
+            span = np.nanmax(values) - np.nanmin(values)
+            if span > 0:
+                error = max(error, np.nanmax(np.abs(decodedLine[axis] - values)) / span)
+    return error
+
+##########################################
+#
+def benchPayload(datafilenames):
+    """Compare the figure JSON sizes and decode times of lists and typed arrays
+    """
+    encodings = figurejson.availableEncodings()
+    formats = [('lists', False, None), ('float64', True, 'float64'),
+               ('auto', True, 'auto'), ('float32', True, 'float32')]
+
+    print(f'{"file":28s} {"format":8s} {"samples":>8s} {"kB":>8s} ' 
+          + ' '.join(f'{encoding + " kB":>8s}' for encoding in encodings)
+          + f' {"B/sample":>9s} {"encode [ms]":>12s} {"decode [ms]":>12s} {"error":>8s}')
+    for datafilename in datafilenames:
+        figdict = payloadFigure(readDataFile(datafilename))
+        numSamples = sum(len(line['x']) + len(line['y']) for line in figdict['data'])
+
+        for label, typed, precision in formats:
+            linePrecisions = [precision] * len(figdict['data']) if typed else None
+            saved = figurejson.typedArrays
+            figurejson.typedArrays = typed
+            try:
+                tencode, body = timeit(lambda: figurejson.figureJSON(figdict, linePrecisions), repeat=3)
+            finally:
+                figurejson.typedArrays = saved
+            sizes = [len(figurejson.compressBody(body, encoding)) for encoding in encodings]
+            tdecode, decoded = timeit(lambda: decodePayload(body), repeat=3)
+
+            print(f'{os.path.basename(datafilename):28s} {label:8s} {numSamples:8d} {len(body)/1e3:8.1f} '
+                  + ' '.join(f'{size/1e3:8.1f}' for size in sizes)
+                  + f' {min([len(body)] + sizes)/numSamples:9.2f} {1000*tencode:12.2f} '
+                  f'{1000*tdecode:12.2f} {payloadError(figdict, decoded):8.1e}')
+
+##########################################
+#
+def matNames(numChannels):
+    """Channel names for a synthetic GTV file
+    """
+    return ['TIME', 'host_bfAtpEvents'] + [f'channel{i:04d}' for i in range(numChannels - 2)]
+
+##########################################
+#
+def matColumn(name, numRows):
+    """Values of a channel in a synthetic GTV file, ATP starts at 10% of the file
+    """
+    if name == 'TIME':
+        return np.arange(numRows) * 0.001
+    if name == 'host_bfAtpEvents':
+        return (np.arange(numRows) >= numRows // 10).astype(float)
+    return np.random.randn(numRows)
+
+##########################################
+#
+def writeMat73File(filename, numRows, numChannels):
+    """Write a synthetic GTV file in matlab v7.3 (HDF5) format, one channel at a time
+    """
+    import h5py
+    names = matNames(numChannels)
+    maxlen = max(len(name) for name in names)
+
+    with h5py.File(filename, 'w', userblock_size=512) as fout:
+        # matlab matrices are stored column by column, i.e., transposed
+        data = fout.create_dataset('DATA', shape=(numChannels, numRows), dtype='float64')
+        data.attrs['MATLAB_class'] = np.bytes_('double')
+        for i, name in enumerate(names):
+            data[i, :] = matColumn(name, numRows)
+
+        chars = np.array([[ord(c) for c in name.ljust(maxlen)] for name in names], dtype='uint16')
+        nam = fout.create_dataset('NAM', data=chars.T)
+        nam.attrs['MATLAB_class'] = np.bytes_('char')
+        nam.attrs['MATLAB_int_decode'] = np.int32(2)
+
+    # the matlab header in the HDF5 user block
+    header = 'MATLAB 7.3 MAT-file, Platform: GLNXA64, Created on: ' + \
+        time.strftime('%a %b %d %H:%M:%S %Y') + ' HDF5 schema 1.00 .'
+    with open(filename, 'r+b') as fout:
+        fout.write(header.ljust(116).encode() + b'\x00' * 8 + b'\x00\x02IM')
+
+##########################################
+#
+def writeMatFiles(workdir, megabytes, numChannels=100):
+    """Write the synthetic GTV files in v5 and v7.3 formats, if not written before
+
+    returns: dict with the format as key and the filename as value
+    """
+    numRows = int(megabytes * 1024**2 / 8 / numChannels)
+    filenames = {}
+
+    filename = os.path.join(workdir, f'gtv-{megabytes}MB-v73.mat')
+    if not os.path.exists(filename):
+        writeMat73File(filename, numRows, numChannels)
+    filenames['v7.3'] = filename
+
+    # v5 files are limited to 2 GB per variable
+    if megabytes < 2048:
+        filename = os.path.join(workdir, f'gtv-{megabytes}MB-v5.mat')
+        if not os.path.exists(filename):
+            from scipy.io import savemat
+            names = matNames(numChannels)
+            data = np.empty((numRows, numChannels), order='F')
+            for i, name in enumerate(names):
+                data[:, i] = matColumn(name, numRows)
+            savemat(filename, {'DATA': data, 'NAM': np.array(names)})
+        filenames['v5'] = filename
+
+    return filenames
+
+##########################################
+#
+def legacyMatRead(datafilename, usecols=None):
+    """The matlab file loader used by loadData before telemetryio.py
+    """
+    from scipy.io import loadmat
+    dataMat = loadmat(datafilename)
+    # the synthetic names are padded to the same length
+    df = pd.DataFrame(dataMat['DATA'], columns=[name.strip() for name in dataMat['NAM']])
+    counter = df['host_bfAtpEvents'][df['host_bfAtpEvents'] == 1].index.values.astype(int)[0]
+    df['TIME'] = df['TIME'] - df['TIME'][counter]
+    return df
+
+##########################################
+#
+def peakRSS():
+    """The peak resident memory of this process in MB, None if not known
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kB elsewhere
+    return maxrss / 1024**2 if sys.platform == 'darwin' else maxrss / 1024
+
+##########################################
+#
+def measureMatRead(reader, datafilename, usecols):
+    """Load a matlab file, to be run in a new process
+
+    returns: (load time, peak memory increase in MB or None, dataframe shape)
+    """
+    rssStart = peakRSS()
+    dt, df = timeit(lambda: reader(datafilename, usecols))
+    rssEnd = peakRSS()
+    return dt, None if rssStart is None else rssEnd - rssStart, df.shape
+
+##########################################
+#
+def benchMatRead(workdir, megabytes):
+    """Compare the original matlab loader with readMatFile
+    """
+    filenames = writeMatFiles(workdir, megabytes)
+    usecols = matNames(100)[:10]
+
+    readers = [('legacy', legacyMatRead, None), 
+               ('readMatFile', readMatFile, None),
+               ('readMatFile usecols', readMatFile, usecols)]
+
+    print(f'{"file":24s} {"loader":20s} {"time [s]":>9s} {"peak [MB]":>10s} {"shape":>16s}')
+    for fmt, filename in sorted(filenames.items()):
+        for name, reader, columns in readers:
+            if reader is legacyMatRead and fmt == 'v7.3':
+                # scipy does not read v7.3 files
+                continue
+            # a new process for each load, for the peak memory
+            with ProcessPoolExecutor(1) as executor:
+                dt, rss, shape = executor.submit(measureMatRead, reader, filename, columns).result()
+            rss = 'n/a' if rss is None else f'{rss:.0f}'
+            print(f'{os.path.basename(filename):24s} {name:20s} {dt:9.2f} {rss:>10s} {str(shape):>16s}')
+
+##########################################
+#
+webglPage = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>WebGL benchmark</title>
+<script src="plotly.min.js"></script>
+</head>
+<body>
+<h3>Time to draw a line as scatter (SVG) and scattergl (WebGL)</h3>
+<table id="results" border="1" cellpadding="4">
+<tr><th>points</th><th>type</th><th>draw [ms]</th></tr>
+</table>
+<div id="plot" style="height:400px"></div>
+<script>
+var sizes = [SIZES];
+var types = ['scatter', 'scattergl'];
+
+function makeLine(n) {
+    var x = new Float64Array(n);
+    var y = new Float64Array(n);
+    for (var i = 0; i < n; i++) {
+        x[i] = i;
+        y[i] = Math.sin(i / 1000) + 0.1 * Math.random();
+    }
+    return {x: x, y: y};
+}
+
+function nextFrame() {
+    // the plot is drawn at the latest by the second animation frame
+    return new Promise(function(resolve) {
+        requestAnimationFrame(function() { requestAnimationFrame(resolve); });
+    });
+}
+
+async function run() {
+    var table = document.getElementById('results');
+    for (var n of sizes) {
+        var line = makeLine(n);
+        for (var type of types) {
+            Plotly.purge('plot');
+            await nextFrame();
+            var tstart = performance.now();
+            await Plotly.newPlot('plot', [{x: line.x, y: line.y, type: type, mode: 'lines'}]);
+            await nextFrame();
+            var dt = performance.now() - tstart;
+            var row = table.insertRow();
+            row.insertCell().textContent = n;
+            row.insertCell().textContent = type;
+            row.insertCell().textContent = dt.toFixed(0);
+        }
+    }
+    document.title = 'WebGL benchmark done';
+}
+run();
+</script>
+</body>
+</html>
+"""
+
+##########################################
+#
+def benchWebGL(workdir, points, show=False):
+    """Write the page measuring the draw time of scatter and scattergl lines
+    """
+    from figurejson import writePlotlyJS
+    writePlotlyJS(workdir)
+    filename = os.path.abspath(os.path.join(workdir, 'webgl-benchmark.html'))
+    with open(filename, 'w') as fout:
+        fout.write(webglPage.replace('SIZES', ', '.join(str(n) for n in points)))
+    print(f'Open {filename} in the browser to be measured')
+
+    if show:
+        from PyQt5 import QtWidgets, QtCore, QtWebEngineWidgets
+        appMain = QtWidgets.QApplication(sys.argv)
+        view = QtWebEngineWidgets.QWebEngineView()
+        view.setUrl(QtCore.QUrl.fromLocalFile(filename))
+        view.resize(1000, 800)
+        view.show()
+        appMain.exec_()
+
+##########################################
+#
+if __name__ == "__main__":
+
+    try:
+        from docopt import docopt
+    except ImportError:
+        print('Install docopt using Anaconda:')
+        print('    conda install -c anaconda docopt')
+        print('or if not using Anaconda: ')
+        print('    pip install docopt')
+        print('or simply put the docopt.py script in the working folder')
+        sys.exit(0)
+
+    options = """pyqt-dash-benchmark.py
+
+        Usage:
+          pyqt-dash-benchmark.py csvread [--scale=<n>] [--workdir=<dir>]
+          pyqt-dash-benchmark.py zoom [--samples=<n>] [--maxpoints=<n>]
+          pyqt-dash-benchmark.py config [--lines=<n>]
+          pyqt-dash-benchmark.py matread [--megabytes=<n>] [--workdir=<dir>]
+          pyqt-dash-benchmark.py webgl [--points=<list>] [--workdir=<dir>] [--show]
+          pyqt-dash-benchmark.py expr [--rows=<n>]
+          pyqt-dash-benchmark.py payload
+          pyqt-dash-benchmark.py -h | --help
+
+        Options:
+          -h, --help                           Show this screen.
+          -s <n>, --scale <n>                  Number of times the data rows are repeated [default: 1000].
+          -w <dir>, --workdir <dir>            Folder for the scaled data files [default: ./benchdata].
+          --samples <n>                        Number of samples in the synthetic line [default: 10000000].
+          --maxpoints <n>                      Point budget per line [default: 5000].
+          --lines <n>                          Number of lines in the synthetic graph sheet [default: 500].
+          --megabytes <n>                      Size of the synthetic matlab files in MB [default: 2048].
+          --points <list>                      Comma separated numbers of points per line [default: 10000,100000,1000000].
+          --show                               Open the page in a QtWebEngine window.
+          --rows <n>                           Number of rows in the synthetic data frame [default: 200000].
+
+    """
+    # process commandline arguments
+    optionArguments = docopt(options)
+
+    workdir = optionArguments["--workdir"]
+    if not os.path.exists(workdir):
+        os.makedirs(workdir)
+
+    if optionArguments["csvread"]:
+        benchCSVRead(workdir, int(optionArguments["--scale"]))
+
+    if optionArguments["zoom"]:
+        benchZoom(int(optionArguments["--samples"]), int(optionArguments["--maxpoints"]))
+
+    if optionArguments["config"]:
+        benchConfig(int(optionArguments["--lines"]))
+
+    if optionArguments["matread"]:
+        benchMatRead(workdir, int(optionArguments["--megabytes"]))
+
+    if optionArguments["webgl"]:
+        benchWebGL(workdir, [int(n) for n in optionArguments["--points"].split(',')], 
+                   optionArguments["--show"])
+
+    if optionArguments["expr"]:
+        benchExpr(int(optionArguments["--rows"]))
+
+    if optionArguments["payload"]:
+        benchPayload(['data/tp05j2a_Moving0.traj', 'data/tp05j2a_Observer0.traj',
+                      'data/tp05j2a_Observer0.gmbl', 'data/tp05j2a.rgeo'])
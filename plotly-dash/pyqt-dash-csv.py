@@ -33,7 +33,10 @@ https://github.com/plotly/dash-recipes
 https://github.com/plotly/dash-recipes/blob/master/multiple-hover-data.py
 https://plot.ly/python/subplots/
 
-This script requires openpyxl, PyQt5, numpy, pandas, plotly and dash modules.
+This script requires openpyxl, PyQt5 (not with --headless), numpy, pandas, plotly and dash modules.
+The telemetryio.py, lineconfig.py, channelexpr.py and figurejson.py modules in this folder must be available, 
+pyarrow is optional but speeds up reading comma separated files, flask-compress is optional 
+and compresses the responses of the server (with brotli if installed, else gzip).
 
 To install dash when connected to the internet:
 conda config --add channels conda-forge
@@ -66,19 +69,19 @@ https://anaconda.org/plotly/dash/files
 """
 
 import sys
+import time
 import threading
 import pandas as pd
-import openpyxl as oxl
-import numpy as np
-
-from PyQt5 import QtWidgets
-import PyQt5.QtCore as QtCore
-from PyQt5 import QtWebEngineWidgets
 
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
 from dash.dependencies import Input, Output
+
+from telemetryio import readDataFile, configColumns
+from lineconfig import compileSheet, readConfigWorkbook
+from figurejson import enableCompression
+from viewer import runViewer, reportFirstRequest
 # import plotly.graph_objs as go
 
 
@@ -89,46 +92,47 @@ def makePageFromCVS(configfile):
     configfile: the Excel file that defines the plots
     """
 
-    #read the config file
-    cxls = pd.ExcelFile(configfile)
-    dfc = pd.read_excel(cxls, 'header')
+    #read all sheets in the config file (or its unchanged sidecar) at once
+    cxls = readConfigWorkbook(configfile)
+    dfc = cxls['header']
     dfc = dfc.set_index('Variable')
 
     # get a list of graph sheetnames (ignore the header sheet)
-    cwb =  oxl.load_workbook(configfile)
-    # sheetnames = [sn for sn in cwb.get_sheet_names() if 'graph' in sn]
-    sheetnames = [sn for sn in cwb.sheetnames if 'graph' in sn]
-    # dataframe to contain ALL the sheets' info
-    dfg = pd.DataFrame()
-
-    # build dfg with all sheets' info
+    sheetnames = [sn for sn in cxls if 'graph' in sn]
+    # collect all the sheets, to be joined once
+    sheets = []
     for shtnum,sheetname in enumerate(sheetnames):
-        dft = pd.read_excel(cxls, sheetname)
+        dft = cxls[sheetname].copy()
         # add info to identify the lines associated with this sheet
         dft['Graph'] = sheetname
         dft['ShtNum'] = shtnum
-        # create unique index values by adding number of the yValues string
-        dft['Index'] = dft['Variable']
-        i = 0
-        for index,row in dft.iterrows():
-            if 'yValue' in row['Variable']:
-                dft.loc[index,'Index'] = f"{row['Variable']}{i:03d}"
-                i = i + 1
-        # make 'Index' column the index
-        dft = dft.set_index('Index')
-        # append this sheet to the master data frame
-        dfg = dfg.append(dft)
+        sheets.append(dft)
+
+    # dataframe to contain ALL the sheets' info
+    dfg = pd.concat(sheets, ignore_index=True)
+
+    # create unique index values by adding number of the yValues string
+    variable = dfg['Variable'].astype(str)
+    isValue = variable.str.contains('yValue', regex=False)
+    lineNum = isValue.groupby(dfg['ShtNum']).cumsum() - 1
+    dfg['Index'] = dfg['Variable']
+    dfg.loc[isValue, 'Index'] = variable + lineNum.map('{:03d}'.format)
+    # make 'Index' column the index
+    dfg = dfg.set_index('Index')
 
     # print(dfg)
 
     # get data filenames in all the graphs
     datafilenames = dfg[(dfg['Variable']=='Datafile')]['Value'].unique()
 
+    # only the columns used in the graphs are read from the data files
+    usecols = configColumns(dfg)
+
     # load all the data files, but only once into a dict with filename as key
     datafiles = {}
     for datafilename in datafilenames:
         # read the data file
-        datafiles[datafilename] = pd.read_csv(datafilename, sep="\s+|,|;", index_col=None,engine='python')
+        datafiles[datafilename] = readDataFile(datafilename, usecols=usecols[datafilename])
 
     # get list of all graphs in dfg
     graphs = dfg['Graph'].unique()
@@ -136,74 +140,57 @@ def makePageFromCVS(configfile):
     # each entry in this list is a different graph
     lstgraphs = []
     for graph in graphs:
-        # extract info for this graph
-        dft = dfg[(dfg['Graph']==graph)]
+        # compile the info for this graph once, the sheet defines a single graph
+        sheet = compileSheet(dfg[(dfg['Graph']==graph)], graph)
+        graphSpec = sheet.graphs[0]
+        # get dataframe for this graph
+        df = datafiles[sheet.datafile]
         # list of all the line entries for this graph
         graphData = []
         # build the data for all lines in this graph
-        for index,row in dft[(dft['Variable']=='yValue')].iterrows():
-            # get the filename for this graph
-            dfilename = dft[(dft['Variable']=='Datafile')]['Value'].values[0]
-            # get dataframe for this graph
-            df = datafiles[dfilename]
-
-            # yscale
-            if 'Scale' in row:
-                if not np.isnan(row['Scale']):
-                    yscale = row['Scale']
-                else:
-                    yscale = 1.0
-            # x scale
-            if not np.isnan(dft[(dft['Variable']=='xValue')]['Scale'][0]):
-                xscale = float(dft[(dft['Variable']=='xValue')]['Scale'][0])
-            else:
-                xscale = 1.0
-                    
+        for line in graphSpec.lines:
             # each line in each graph must be a dict as follows:
             dLines = {
-                'x':df[dft[(dft['Variable']=='xValue')].loc['xValue','Value']] * xscale,
-                'y':df[row['Value']] * yscale,
+                'x':df[sheet.xcolumn] * sheet.xscale,
+                'y':df[line.column] * line.scale,
                 'line':{}
             }
 
             # fill in non-default values
-            if not np.isnan(row['Linewidth']):
-                dLines['line']['width'] = row['Linewidth']
+            if line.width is not None:
+                dLines['line']['width'] = line.width
 
-            if isinstance(row['Colour'], str):
-                dLines['line']['color'] = row['Colour']
+            if line.colour is not None:
+                dLines['line']['color'] = line.colour
 
-            if isinstance(row['Dash'], str):
-                dLines['line']['dash'] = row['Dash']
+            if line.dash is not None:
+                dLines['line']['dash'] = line.dash
 
-            if isinstance(row['GraphType'], str):
-                dLines['type'] = row['GraphType']
+            if line.graphtype is not None:
+                dLines['type'] = line.graphtype
 
-            if isinstance(row['LineLabel'], str):
-                dLines['name'] = row['LineLabel']
-            else:
-                dLines['name'] = row['Value']
+            dLines['name'] = line.label
 
             # add this line to other lines in this graph
             graphData.append(dLines)
 
         # appends the graph blocks to the list of graphs (top, graph, bottom)
         # append the text at the top of the graph
-        if 'GraphTop' in dft.index:
-            lstgraphs.append(html.Div([dcc.Markdown(children=dft.loc['GraphTop','Value'])]))
+        if sheet.value('GraphTop') is not None:
+            lstgraphs.append(html.Div([dcc.Markdown(children=sheet.value('GraphTop'))]))
         # append the actual graph
         lstgraphs.append(html.Div([dcc.Graph(
                 id=graph,
-                figure={'layout':{'title':dft.loc['Title','Value'],
-                                'xaxis':{'title':dft.loc['xLabel','Value']},
-                                'yaxis':{'title':dft.loc['yLabel','Value']},
+                figure={'layout':{'title':graphSpec.title,
+                                'xaxis':{'title':sheet.xlabel},
+                                'yaxis':{'title':graphSpec.ylabel},
                                 },
                     'data':graphData},
-                style={'height': str(dft.loc['Height','Value'])},
+                style={'height': str(sheet.height)},
             )]))
         # append the text at the bottom of the graph
-        if 'GraphBottom' in dft.index:
-            lstgraphs.append(html.Div([dcc.Markdown(children=dft.loc['GraphBottom','Value'])]))
+        if sheet.value('GraphBottom') is not None:
+            lstgraphs.append(html.Div([dcc.Markdown(children=sheet.value('GraphBottom'))]))
 
     # get the header info from header sheet
     pagetitle = dfc.loc['Pagetitle','Value'] if 'Pagetitle' in dfc.index else ''
@@ -226,51 +213,79 @@ def makePageFromCVS(configfile):
 def run_dash(pageLayout,port):
     """Initiate the Dash server and serve the page
 
-    pageLayout: info the be served in Plotly data formal
+    pageLayout: info to be served in Plotly data format
     port: port number to be used
     """
     # start a dash app, which also starts a Flask server
+    app = createApp(pageLayout)
+    app.run_server(debug=False, port=port)
+
+
+def createApp(pageLayout):
+    """Create the Dash app serving the page
+
+    app.server is the Flask WSGI app, see wsgi.py to serve it with 
+    a production WSGI server.
+
+    pageLayout: info to be served in Plotly data format
+
+    returns: the Dash app
+    """
     app = dash.Dash()
     # override security restrictions: allow the serving of local pages
     app.css.config.serve_locally = True
     app.scripts.config.serve_locally = True
     app.layout = pageLayout
+    enableCompression(app.server)
     # app.css.append_css({
     #     'external_url': 'https://codepen.io/chriddyp/pen/bWLwgP.css'
     # })
-    app.run_server(debug=False, port=port)
-
-
-# creates a browser widget
-class WebViewer(QtWebEngineWidgets.QWebEngineView):
-    def __init__(self, parent, url):
-        """Create a web browser widget
+    return app
 
-        parent: the parent GUI element where this is included.
-        url: the url to be browsed
-        """
-        super().__init__(parent)
-        page = QtWebEngineWidgets.QWebEnginePage(self)
-        self.setPage(page)
-        self.setUrl(QtCore.QUrl(url))
 
 ##########################################
 #
 
 if __name__ == "__main__":
 
-    sys.argv.append("--disable-web-security")
-    
+    try:
+        from docopt import docopt
+    except ImportError:
+        print('Install docopt using Anaconda:')
+        print('    conda install -c anaconda docopt')
+        print('or if not using Anaconda: ')
+        print('    pip install docopt')
+        print('or simply put the docopt.py script in the working folder')
+        sys.exit(0)
+
+    options = """pyqt-dash-csv.py
+
+        Usage:
+          pyqt-dash-csv.py [--headless]
+          pyqt-dash-csv.py -h | --help 
+ 
+        Options:
+          -h, --help                           Show this screen.
+          --headless                           Only serve the page, without the PyQt browser.
+ 
+    """
+    # process commandline arguments
+    optionArguments = docopt(options)
+
+    tstart = time.perf_counter()
+
     port = '8050' # used for the local Flask server
 
     configfile = 'data/pyqt-dash-config.xlsx'
     pageLayout = makePageFromCVS(configfile) 
-    threading.Thread(target=run_dash, args=(pageLayout,port), daemon=True).start()
 
-    app = QtWidgets.QApplication(sys.argv)
-    main_widget = QtWidgets.QWidget(None)
-    window_layout = QtWidgets.QVBoxLayout(main_widget)
-    window_layout.addWidget(WebViewer(main_widget,f'http://127.0.0.1:{port}'))
-    main_widget.show()
+    # only the server, in the main thread
+    if optionArguments["--headless"]:
+        app = createApp(pageLayout)
+        reportFirstRequest(app, tstart)
+        app.run_server(debug=False, port=port)
+        sys.exit(0)
+
+    threading.Thread(target=run_dash, args=(pageLayout,port), daemon=True).start()
 
-    sys.exit(app.exec_())
+    sys.exit(runViewer(port))
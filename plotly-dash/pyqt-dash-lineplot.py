@@ -31,7 +31,160 @@ https://github.com/plotly/dash-recipes
 https://github.com/plotly/dash-recipes/blob/master/multiple-hover-data.py
 https://plot.ly/python/subplots/
 
-This script requires openpyxl, PyQt5, numpy, scipy, pandas, plotly and dash modules.
+This script requires openpyxl, PyQt5 (not with --headless), numpy, scipy, pandas, plotly and dash modules.
+The telemetryio.py, tracetools.py, lineconfig.py, figurejson.py, stageprofile.py, channelexpr.py, timealign.py and channelstats.py modules in this folder must be available, 
+pyarrow is optional but speeds up reading comma separated files, 
+flask-compress and brotli are optional and compress the responses.
+
+Text data files are read with the separator sniffed from the first few lines
+of each file.  The optional Datatype variable in a graph sheet 
+(e.g., float32) is passed to the parser for that sheet's data file.
+
+Parsed data files are cached in the folder given by --cachedir, so that 
+the next start loads unchanged files without parsing them.  The cache 
+is limited to --cachesize MB, the least recently used files are removed 
+first.  Use --no-cache to bypass the cache or --rebuild-cache to parse 
+all files and rewrite their cache entries.
+
+Only the xValue and yValue columns referenced in the config are read 
+from the data files.
+
+By default the data files are loaded one after the other.  With 
+--workers=N they are loaded in parallel by N processes (for text files 
+parsed by the C or python parser) or threads (all other files), 
+--workers=0 for as many as there are CPUs.  Starting the pool takes 
+longer than loading a few small files, use it for many or large files.  
+The progress is printed as the files are loaded.
+
+For data files larger than the available memory use --mmap, which memory 
+maps the column files in the cache instead of loading them, so that only 
+the parts of the columns that are plotted or zoomed into are read from 
+disk, and several dash processes share the same pages in memory.  
+Use --convert to write the data files to the cache beforehand, 
+the --cachesize must be large enough to keep all the data files.
+
+Lines longer than MaxPoints samples (default 5000, set in the header 
+sheet or per graph sheet) are decimated before sending them to the 
+browser.  The Decimation variable selects 'lttb' 
+(largest-triangle-three-buckets, the default), 'minmax' (min/max envelope,
+keeps all peaks) or 'none'.  Zooming into a graph fetches the lines 
+again over the zoomed x range, decimated to the same point budget, so
+more detail is shown the further you zoom in.  If the x column is sorted
+the zoomed range is found by binary search.  The decimation makes a few
+numpy passes over the samples in the zoomed range, about 25 ms per line
+of 10M samples with the default MaxPoints (benchmark zoom command of 
+pyqt-dash-benchmark.py).
+Derived channels are defined in a graph sheet by Channel rows with 
+the channel name and expression as value, e.g., 
+speed = sqrt(velocity.w[0]**2 + velocity.w[1]**2) or 
+heading = degrees(unwrap(yaw)), and used as xValue or yValue like the 
+data columns.  The expressions are compiled once and evaluated over 
+whole columns with numpy, see channelexpr.py.  
+
+A graph can show lines from several data files sampled at different 
+rates: a yValue row with a Datafile cell is read from that file, with 
+its time column in the xValue cell (default the sheet's xValue column, 
+in the same units), and aligned onto the sheet's x column.  The Resample 
+variable (in the header sheet or per graph sheet) selects 'linear' 
+(the default), 'nearest' or 'hold' (zero-order hold), see timealign.py.
+
+With Statistics set (True, in the header sheet) a Statistics tab shows 
+the count, min, max, mean, standard deviation and percentiles of each 
+line plotted in the graph sheets: data columns, derived channels and 
+lines aligned from other data files, but not the columns only used to 
+derive channels or align lines.  The statistics are computed in chunks 
+of rows when the tab is first shown (see channelstats.py), without 
+copying the data, and the lines from one data file are kept in the cache 
+with the parsed data file.  For followed data files only the appended 
+rows are merged into the statistics, and the shown tab is updated.
+
+With LinkX set (True, in the header sheet or per graph sheet) zooming 
+one graph zooms all the graphs of the graph sheet to the same x range, 
+their lines are fetched again in one callback.  Linking requires callbacks.
+Pattern-matching callbacks require dash 1.11 or later.
+
+Lines with more than WebGLPoints points (default 2000, set in the header 
+sheet or per graph sheet) after decimation are drawn with WebGL 
+(scattergl) instead of SVG (scatter), which is much faster for many 
+points.  The default is below the default MaxPoints, so that decimated 
+long lines are drawn with WebGL.  A GraphType given for a line in the config is always used, 
+e.g., GraphType scatter keeps a line in SVG.
+
+With callbacks the figures are serialized to JSON once, when the graph
+is built (see figurejson.py), and the browser fetches them from the 
+/figure/<graph>/<set>/<key> route of the server, so that showing a tab again does not 
+serialize the figures again.  The key is a hash of the graph sheet, 
+the header sheet and the data file, so that changed figures get a new url.
+This requires dash 2.15 or later, for the typed arrays and duplicate
+callback outputs, and orjson is recommended.
+
+The line arrays are sent as typed arrays (binary, base64), also when 
+zooming, in float32 where the precision allows.  The Precision variable 
+(in the header sheet or per graph sheet) or a Precision cell of a yValue 
+row selects 'auto' (the default, float32 if its rounding error is far 
+below a pixel), 'float32' or 'float64', see figurejson.py.
+The figure JSON is compressed once with brotli (if installed) or gzip, 
+and the other responses are compressed with flask-compress (if installed).
+Use the payload command of pyqt-dash-benchmark.py to compare the sizes.
+
+The graphs of the graph sheets with ToDisk (default True) are written to 
+html files in the current folder by a background thread, at startup and 
+after the watched files are reloaded, so that showing a tab does not wait 
+for them.  Graph sheets with unchanged config and data since the files 
+were written are skipped (hashes in export-hashes.json).
+The html files reference a shared plotly.min.js file in the same folder.  
+With --export-only the graphs of all included graph sheets are written 
+to html files in --exportdir by --export-workers processes (default as 
+many as there are CPUs), without starting the server, again skipping the 
+graph sheets unchanged since the previous export (hashes in 
+export-hashes.json in --exportdir).
+The html files cannot fetch more detail when zoomed, so their lines are 
+not decimated to MaxPoints.  Set DecimateDisk (True, in the header sheet 
+or per graph sheet) to decimate them as well, for smaller files.
+
+To serve the portal to several users at once, run it with a production 
+WSGI server and several worker processes, see wsgi.py.
+With --headless only the Dash server is started, in the main thread, 
+without importing PyQt5 or starting the PyQt browser, e.g., for smoke 
+tests or a server without display.  The time to the first request 
+served is printed.
+
+With --profile the wall time, CPU time and peak memory of the startup 
+stages (loadConfig, loadData, prepareGraphs, makePage and the first 
+response showing the graphs) and of each data file and graph sheet are 
+printed after the first response (see stageprofile.py).  
+--profile-stats writes the cProfile statistics of the main thread, 
+e.g., for snakeviz, and --profile-trace writes a Chrome trace JSON 
+file, to be opened in chrome://tracing or https://ui.perfetto.dev.
+
+All sheets of the config file are read in one pass and kept in a JSON 
+sidecar file (the config filename with .json appended), which is used 
+instead of the config file until the config file is changed.
+Each graph sheet is compiled once into a GraphSheet (see lineconfig.py),
+which is used to build the graphs.
+
+With callbacks (the default) the graphs in a tab are only built when the
+tab is first shown, so that startup time does not depend on the number 
+of tabs.  The --tabcache most recently shown tabs are kept in memory.
+The startup time and the time to build each tab are printed.
+Without callbacks (--nocallback) all tabs are built at startup.
+
+With --watch the config and data files are checked for changes every 
+--watch seconds.  Changed data files are reloaded and the graph sets using 
+them are rebuilt.  If the config file changed, only the changed graph 
+sheets are rebuilt and only new or changed data files are loaded.  
+The page in the browser is updated by a dcc.Interval callback, 
+without restarting the server.  Watching requires callbacks.
+
+With --follow the text data files are followed while they are being 
+written, e.g., --follow=0.1 for ten updates per second.  Only the rows 
+appended since the previous read are parsed (see TailReader in 
+telemetryio.py) and sent to the graphs in the browser with extendData, 
+so that the cost of an update does not depend on the file length.  
+The browser keeps the last MaxPoints points of each followed line.
+Zooming out (autorange) shows all the rows read so far, decimated.  Followed files 
+are not cached, and are not reloaded by --watch.  Following requires 
+callbacks.
 
 To install dash when connected to the internet:
 conda config --add channels conda-forge
@@ -65,24 +218,80 @@ https://anaconda.org/plotly/dash/files
 """
 
 import sys, os
+import time
+import json
 import threading
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import pandas as pd
-import openpyxl as oxl
 import numpy as np
 
-from PyQt5 import QtWidgets
-import PyQt5.QtCore as QtCore
-from PyQt5 import QtWebEngineWidgets
-
+import flask
+import plotly
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
-from dash.dependencies import Input, Output, State
+import dash_table
+from dash.dependencies import Input, Output, State, MATCH, ALL
+from dash.exceptions import PreventUpdate
+
+from telemetryio import readTelemetryFile, holdsGIL, configColumns, DataCache, TailReader
+from tracetools import decimateIndices, rangeIndices, growBuffer
+from lineconfig import compileSheet, isGiven, readConfigWorkbook
+from figurejson import (figureJSON, figureKey, typedArrays, typedFigure, precisions, availableEncodings,
+                        compressBody, enableCompression, writeFigureHTML, writePlotlyJS)
+from stageprofile import StageProfiler
+from channelexpr import channelExpression
+from timealign import Alignment, methods as alignMethods
+from channelstats import StreamingStats, percentiles
+from viewer import runViewer, reportFirstRequest
 
 external_stylesheets = ['assets/bWLwgP.css']
 
 pd.set_option('display.max_rows', 500)
 
+# maximum number of points per line sent to the browser, if not in the config
+defaultMaxPoints = 5000
+
+# lines with more points are drawn with WebGL (scattergl), if not in the config,
+# below defaultMaxPoints so that the decimated long lines are promoted
+defaultWebGLPoints = 2000
+
+# build the tabs when shown by callbacks, or all tabs into the page at startup
+useCallbacks = True
+
+# number of built tabs kept in memory when using callbacks
+maxGraphSets = 8
+
+# startup stage profiler, enabled by --profile
+profiler = StageProfiler()
+
+# value of the Statistics tab, the graph tabs are 'Tab <number>'
+statsTabValue = 'Tab Statistics'
+
+# the graph sets are built by the callbacks in the server thread(s)
+# and the data are reloaded by the file watcher thread
+graphLock = threading.RLock()
+
+# the html files of the ToDisk graph sheets are written by one thread at a time
+diskLock = threading.Lock()
+
+# incremented every time the watched files are reloaded
+dataVersion = 0
+
+# time in seconds between checks for changed files, 0 to not check
+watchInterval = 0
+
+# time in seconds between reads of the rows appended to the data files, 0 to not follow
+followInterval = 0
+
+# incremental readers of the followed data files, keyed by data file name
+tailReaders = {}
+
+# memory map the cached data columns instead of loading them
+useMmap = False
+
 # nice links:
 # https://towardsdatascience.com/creating-an-interactive-data-app-using-plotlys-dash-356428b4699c
 # https://dash.plot.ly/dash-core-components/tabs
@@ -90,83 +299,411 @@ pd.set_option('display.max_rows', 500)
 
 ##########################################
 #
-def makeGraphSet(dft, graph):
+def configValue(sheet, variable, default):
+    """Value of an optional config variable, from the graph sheet or else the header sheet
 
-    # get the header info from header sheet
-    pagetitle = dfc.loc['Pagetitle','Value'] if 'Pagetitle' in dfc.index else ''
-    pagetop = dfc.loc['PageTop','Value'] if 'PageTop' in dfc.index else ''
-    pagebottom = dfc.loc['PageBottom','Value'] if 'PageBottom' in dfc.index else ''
+    sheet: the compiled graph sheet
+    variable: the name of the config variable
+    default: the value returned if the variable is not given in either sheet
+    """
+    value = sheet.value(variable)
+    if value is not None:
+        return value
+    if variable in dfc.index:
+        value = dfc.loc[variable,'Value']
+        if isinstance(value, pd.Series):
+            value = value.values[0]
+        if isGiven(value):
+            return value
+    return default
 
-    # list of all the line entries for this graph set
-    graphData = []
-    # dictionary to link lines and yValues
-    yValueDict = {}
-    numLines = 0
-    # build the data for all lines in this graph set
-    for index,row in dft[(dft['Variable']=='yValue')].iterrows():
-
-        # add to yValue line dictionary
-        yValueDict[numLines] = str(index)
-        numLines = numLines + 1
-
-        # get the filename for this graph
-        dfilename = dft[(dft['Variable']=='Datafile')]['Value'].values[0]
-        # get dataframe for this graph
-        df = datafiles[dfilename]
-
-        # y scale
-        if 'Scale' in row:
-            if not np.isnan(row['Scale']):
-                yscale = row['Scale']
-            else:
-                yscale = 1.0
-        # x scale
-        if not np.isnan(dft[(dft['Variable']=='xValue')]['Scale'][0]):
-            xscale = float(dft[(dft['Variable']=='xValue')]['Scale'][0])
-        else:
-            xscale = 1.0
-
-        # y offset
-        if 'Offset' in row:
-            if not np.isnan(row['Offset']):
-                yoffset = row['Offset']
-            else:
-                yoffset = 0.
-        # x offset
-        if not np.isnan(dft[(dft['Variable']=='xValue')]['Offset'][0]):
-            xoffset = float(dft[(dft['Variable']=='xValue')]['Offset'][0])
+##########################################
+#
+def isSorted(datafilename, column, channels=None):
+    """Check (once) if a data column is sorted in ascending order
+
+    Only the rows appended to a followed data file since the previous 
+    check are checked.
+
+    datafilename: the data file name, key in datafiles
+    column: the column name, or derived channel name
+    channels: the derived channels of the graph sheet, see columnValues
+    """
+    key = (datafilename, channels[column] if channels and column in channels else column)
+    x = columnValues(datafilename, column, channels)
+    ascending, numChecked = sortedColumns.get(key, (True, 0))
+    if numChecked > len(x):
+        # the data file was restarted
+        ascending, numChecked = True, 0
+    if numChecked < len(x):
+        appended = x[max(numChecked - 1, 0):]
+        ascending = ascending and bool(np.all(appended[1:] >= appended[:-1]))
+        sortedColumns[key] = (ascending, len(x))
+    return ascending
+
+##########################################
+#
+def columnValues(datafilename, column, channels=None):
+    """The values of a data column, or of a derived channel
+
+    Derived channels are evaluated over the whole columns once and kept 
+    for each data file, until the data file is reloaded.  When rows are 
+    appended to a followed data file only the new rows are evaluated, 
+    unless the expression depends on the other rows (e.g., unwrap).
+
+    datafilename: the data file name, key in datafiles
+    column: the column name, or derived channel name
+    channels: the derived channels of the graph sheet, dict with name and expression
+
+    returns: numpy array
+    """
+    df = datafiles[datafilename]
+    if not channels or column not in channels:
+        return np.asarray(df[column])
+
+    key = (datafilename, channels[column])
+    channel = channelExpression(channels[column])
+    values, numRows = derivedColumns.get(key, (None, 0))
+    if values is None or numRows > len(df) or (numRows < len(df) and not channel.rowwise):
+        values = channel.evaluate(df)
+    elif numRows < len(df):
+        rows = channel.evaluate(df, slice(numRows, len(df)))
+        values = growBuffer(values, numRows, len(df), rows.dtype)
+        values[numRows:len(df)] = rows
+    derivedColumns[key] = (values, len(df))
+    return values[:len(df)]
+
+##########################################
+#
+def alignmentKey(spec):
+    """The key of the alignment of a line from another data file
+
+    spec: dict with the line's data files, columns and alignment method
+
+    returns: tuple with the data files, time columns and method, or None for 
+             a line from the graph's data file
+    """
+    if spec['ydatafile'] is None:
+        return None
+    channels = spec['channels']
+    return (spec['ydatafile'], channels.get(spec['ytime'], spec['ytime']), 
+            spec['datafile'], channels.get(spec['xcolumn'], spec['xcolumn']), spec['resample'])
+
+##########################################
+#
+def lineValues(spec):
+    """The y values of a line, aligned to the graph's x column if from another data file
+
+    The alignment of the line's time column to the graph's x column is 
+    computed once for each pair of data files and applied to all the lines 
+    of the other file, the aligned columns are kept until one of the data 
+    files is reloaded.  When rows are appended to a followed data file the 
+    alignment and all its aligned columns are extended, see Alignment.extend.
+
+    spec: dict with the line's data files, columns and alignment method
+
+    returns: numpy array with one value per row of the graph's data file
+    """
+    if spec['ydatafile'] is None:
+        return columnValues(spec['datafile'], spec['ycolumn'], spec['channels'])
+
+    channels = spec['channels']
+    key = alignmentKey(spec)
+    numSource = len(datafiles[spec['ydatafile']])
+    numTarget = len(datafiles[spec['datafile']])
+
+    tsource = columnValues(spec['ydatafile'], spec['ytime'], channels)
+    ttarget = columnValues(spec['datafile'], spec['xcolumn'], channels)
+
+    alignment = alignments.get(key, None)
+    if alignment is not None and (alignment.sourceLength != numSource or alignment.targetLength != numTarget):
+        numAligned = alignment.targetLength
+        rows = alignment.extend(tsource, ttarget)
+        if rows is None:
+            alignment = None
         else:
-            xoffset = 0.
-                
-        # each line in each graph must be a dict as follows:
-        dLines = {
-            'x':df[dft[(dft['Variable']=='xValue')].loc['xValue','Value']] * xscale + xoffset,
-            'y':df[row['Value']] * yscale + yoffset,
-            'line':{}
-        }
+            # the aligned columns of the alignment, with the source column and channels
+            for columnKey in [columnKey for columnKey in alignedColumns if columnKey[0] == key]:
+                values, ycolumn, ychannels = alignedColumns[columnKey]
+                values = growBuffer(values, numAligned, numTarget)
+                values[rows] = alignment.apply(columnValues(spec['ydatafile'], ycolumn, ychannels), rows)
+                alignedColumns[columnKey] = (values, ycolumn, ychannels)
+
+    if alignment is None:
+        alignment = Alignment(tsource, ttarget, spec['resample'])
+        alignments[key] = alignment
+        for columnKey in [columnKey for columnKey in alignedColumns if columnKey[0] == key]:
+            del alignedColumns[columnKey]
+
+    columnKey = (key, channels.get(spec['ycolumn'], spec['ycolumn']))
+    if columnKey not in alignedColumns:
+        alignedColumns[columnKey] = (alignment.apply(columnValues(spec['ydatafile'], spec['ycolumn'], channels)),
+                                     spec['ycolumn'], channels)
+    return alignedColumns[columnKey][0][:numTarget]
 
-        # fill in non-default values
-        if not np.isnan(row['Linewidth']):
-            dLines['line']['width'] = row['Linewidth']
+##########################################
+#
+def forgetColumns(datafilename):
+    """Remove the sorted states, derived channels, alignments and statistics of a data file
 
-        if isinstance(row['Colour'], str):
-            dLines['line']['color'] = row['Colour']
+    datafilename: the data file name, reloaded, restarted or removed
+    """
+    for key in [key for key in sortedColumns if key[0] == datafilename]:
+        del sortedColumns[key]
+    for key in [key for key in derivedColumns if key[0] == datafilename]:
+        del derivedColumns[key]
+    for key in [key for key in alignments if datafilename in (key[0], key[2])]:
+        del alignments[key]
+    for key in [key for key in alignedColumns if datafilename in (key[0][0], key[0][2])]:
+        del alignedColumns[key]
+    for key in [key for key in lineStatistics if datafilename in (key[0],) + (key[2] or ())]:
+        del lineStatistics[key]
 
-        if isinstance(row['Dash'], str):
-            dLines['line']['dash'] = row['Dash']
+##########################################
+#
+def dataFingerprint(datafilename):
+    """The size and modification time of a data file, the number of rows loaded 
+    and the data version
 
-        if isinstance(row['GraphType'], str):
-            dLines['type'] = row['GraphType']
+    datafilename: the data file name, key in datafiles
+    """
+    try:
+        stat = os.stat(datafilename)
+        stamp = f'{stat.st_size}:{stat.st_mtime}'
+    except OSError:
+        # the file was removed after it was loaded
+        stamp = ''
+    return f'{datafilename}:{stamp}:{len(datafiles[datafilename])}:{dataVersion}'
 
-        if isinstance(row['LineLabel'], str):
-            dLines['name'] = row['LineLabel']
+##########################################
+#
+def lineArrays(spec):
+    """The raw x and y arrays of a line, and if the x column is sorted
+
+    Call holding graphLock, the rows appended to a followed data file by 
+    followFiles are added to the cached columns here.  The arrays returned 
+    are views of the rows read so far, the rows appended later are not in them.
+
+    spec: dict with the line's data files, columns and alignment method
+
+    returns: (x, y, xsorted)
+    """
+    return (columnValues(spec['datafile'], spec['xcolumn'], spec['channels']), lineValues(spec),
+            isSorted(spec['datafile'], spec['xcolumn'], spec['channels']))
+
+##########################################
+#
+def decimateLine(spec, xrange=None, rows=None, selections=None, arrays=None):
+    """Scaled and decimated x and y arrays for one line
+
+    spec: dict with the line's data file, columns, scale, offset and point budget
+    xrange: optional (xmin, xmax) in scaled x units, default the full line
+    rows: optional slice of the data rows to use, default all rows
+    selections: optional dict to share the xrange selections between the lines
+                with the same x column (see zoomGraphs)
+    arrays: optional (x, y, xsorted) taken before with lineArrays, default 
+            taken now (the caller holds graphLock)
+
+    returns: (x, y) numpy arrays with at most spec['maxPoints'] samples
+    """
+    x, y, xsorted = lineArrays(spec) if arrays is None else arrays
+    if rows is not None:
+        x = x[rows]
+        y = y[rows]
+
+    if xrange is not None and spec['xscale'] != 0:
+        # convert the range to raw x values, sorted x columns use a binary search
+        xraw = [(value - spec['xoffset']) / spec['xscale'] for value in xrange]
+        selectKey = (spec['datafile'], spec['xcolumn'], min(xraw), max(xraw))
+        if selections is not None and selectKey in selections:
+            select = selections[selectKey]
         else:
-            dLines['name'] = row['Value']
+            select = rangeIndices(x, min(xraw), max(xraw), xsorted)
+            if selections is not None:
+                selections[selectKey] = select
+        x = x[select]
+        y = y[select]
 
-        dLines['showlegend'] = True
+    # decimation is done on the raw values, the selection is scale invariant
+    indices = decimateIndices(x, y, spec['maxPoints'], spec['decimation'])
+    return x[indices] * spec['xscale'] + spec['xoffset'], y[indices] * spec['yscale'] + spec['yoffset']
 
-        # add this line to other lines in this graph
-        graphData.append(dLines)
+##########################################
+#
+def zoomRange(relayoutData):
+    """The zoomed x range from a graph's relayout event data
+
+    relayoutData: the relayout event data from the browser
+
+    returns: (xmin, xmax) in scaled x units, or None for autorange
+    """
+    if not relayoutData:
+        raise PreventUpdate
+
+    if 'xaxis.range[0]' in relayoutData:
+        return (float(relayoutData['xaxis.range[0]']), float(relayoutData['xaxis.range[1]']))
+    elif 'xaxis.range' in relayoutData:
+        return tuple(float(value) for value in relayoutData['xaxis.range'])
+    elif 'xaxis.autorange' in relayoutData:
+        return None
+
+    # no change to the x axis (e.g., y zoom only)
+    raise PreventUpdate
+
+##########################################
+#
+def zoomGraphs(ids, relayoutDatas, zoomedId):
+    """The figures of the graphs in the shown tab after one graph was zoomed
+
+    Only the zoomed graph is rebuilt, unless the graph sheet links the 
+    x axes of its graphs (LinkX), then all the graphs of the sheet are 
+    rebuilt over the zoomed x range in this one call.  The lines with the 
+    same x column share the selection of the samples in the range.
+
+    ids: the ids of all graphs in the tab
+    relayoutDatas: the relayout event data of all graphs in the tab
+    zoomedId: the id of the zoomed graph
+
+    returns: list with a figure or dash.no_update for each graph
+    """
+    index = ids.index(zoomedId)
+    xrange = zoomRange(relayoutDatas[index])
+    graph = zoomedId['graph']
+
+    with graphLock:
+        linked = graph in graphSheets and bool(configValue(graphSheets[graph], 'LinkX', False))
+
+    if not linked:
+        return [zoomFigure(graph, zoomedId['set'], xrange) if thisId == zoomedId else dash.no_update 
+                for thisId in ids]
+
+    selections = {}
+    return [linkedFigure(zoomFigure(graph, thisId['set'], xrange, selections), xrange)
+            if thisId['graph'] == graph else dash.no_update for thisId in ids]
+
+##########################################
+#
+def linkedFigure(figdict, xrange):
+    """Copy of a figure with its x axis set to the linked x range
+
+    The x axis uirevision changes with the range, so that the browser 
+    applies the range also to graphs zoomed by the user before.
+
+    figdict: the figure dict
+    xrange: (xmin, xmax) in scaled x units, or None for autorange
+    """
+    xaxis = dict(figdict['layout'].get('xaxis', {}))
+    if xrange is None:
+        xaxis.update(autorange=True, uirevision='autorange')
+    else:
+        xaxis.update(range=list(xrange), autorange=False, uirevision=f'{xrange[0]}:{xrange[1]}')
+    return dict(figdict, layout=dict(figdict['layout'], xaxis=xaxis))
+
+##########################################
+#
+def zoomFigure(graph, setStr, xrange, selections=None):
+    """Rebuild a graph's figure with the lines decimated over the zoomed x range
+
+    graph: the graph sheet name
+    setStr: the graph number in the graph sheet
+    xrange: (xmin, xmax) in scaled x units, or None for autorange
+    selections: optional dict to share the xrange selections, see decimateLine
+    """
+    with graphLock:
+        # the tab may have been removed from the built graph sets
+        if (graph, setStr) not in graphFigures:
+            if graph not in graphNames:
+                # the graph was removed from the config
+                raise PreventUpdate
+            getGraphSet(graphNames.index(graph))
+        figdict = graphFigures[(graph, setStr)]
+        specs = lineSpecs[(graph, setStr)]
+
+        # followed data have grown since the graph was made, show all rows read so far
+        if xrange is None and specs and specs[0]['datafile'] in tailReaders:
+            followRows[(graph, setStr)] = len(datafiles[specs[0]['datafile']])
+            data = [dict(line, x=x, y=y) for line, (x, y) in 
+                    zip(figdict['data'], [decimateLine(spec) for spec in specs])]
+            return sentFigure({'layout': figdict['layout'], 'data': data}, specs)
+
+        # the rows appended by followFiles later are not in these arrays
+        arrays = [lineArrays(spec) for spec in specs] if xrange is not None else None
+
+    # the full range figure was decimated when the graph was made
+    if xrange is None:
+        return sentFigure(figdict, specs)
+
+    # the zoomed lines are decimated without holding graphLock
+    data = []
+    for line, spec, lineArray in zip(figdict['data'], specs, arrays):
+        x, y = decimateLine(spec, xrange, selections=selections, arrays=lineArray)
+        data.append(dict(line, x=x, y=y))
+
+    return sentFigure({'layout': figdict['layout'], 'data': data}, specs)
+
+##########################################
+#
+def sentFigure(figdict, specs):
+    """The figure as sent to the browser, with the line arrays as typed arrays
+
+    Dash would send the numpy arrays as lists of numbers.
+
+    figdict: the figure dict, with numpy arrays for the line data
+    specs: the line specifications, for the float precision of each line
+    """
+    if not typedArrays:
+        return figdict
+    return typedFigure(figdict, [spec['precision'] for spec in specs])
+
+##########################################
+#
+def followData(graph, setStr):
+    """The rows appended to a followed data file since the graph's figure was sent
+
+    The new rows are scaled and decimated to the point budget, so the cost 
+    per update depends on the number of new rows only.  The browser drops 
+    the oldest points beyond the point budget, so the lines do not grow 
+    without limit.
+
+    graph: the graph sheet name
+    setStr: the graph number in the graph sheet
+
+    returns: extendData value for the graph, or dash.no_update if no new rows
+    """
+    with graphLock:
+        key = (graph, setStr)
+        specs = lineSpecs.get(key, None)
+        if not specs or specs[0]['datafile'] not in tailReaders or key not in followRows:
+            return dash.no_update
+
+        numRows = len(datafiles[specs[0]['datafile']])
+        if numRows <= followRows[key]:
+            # a restarted file is shown again after the reload
+            return dash.no_update
+
+        rows = slice(followRows[key], numRows)
+        followRows[key] = numRows
+        lines = [decimateLine(spec, rows=rows) for spec in specs]
+
+    return [{'x': [x for x, y in lines], 'y': [y for x, y in lines]}, list(range(len(lines))),
+            specs[0]['maxPoints']]
+
+##########################################
+#
+def makeGraphSet(sheet):
+    """Create the Dash components for all graphs in a compiled graph sheet
+
+    sheet: GraphSheet compiled from the graph sheet in the config file
+    """
+    graph = sheet.name
+
+    # get the header info from header sheet
+    pagetitle = dfc.loc['Pagetitle','Value'] if 'Pagetitle' in dfc.index else ''
+    pagetop = dfc.loc['PageTop','Value'] if 'PageTop' in dfc.index else ''
+    pagebottom = dfc.loc['PageBottom','Value'] if 'PageBottom' in dfc.index else ''
+
+    # the figures are cached as JSON for this config and data
+    thisSheetKey = sheetKey(sheet)
 
     thisGraphList = []
 
@@ -174,97 +711,398 @@ def makeGraphSet(dft, graph):
     thisGraphList.append(
         html.Div([dcc.Markdown(children=pagetop)]),
     )  
-    if 'GraphTop' in dft.index:
+    if sheet.value('GraphTop') is not None:
         thisGraphList.append(
-            html.Div([dcc.Markdown(children=dft.loc['GraphTop','Value'])])
+            html.Div([dcc.Markdown(children=sheet.value('GraphTop'))])
         )            
 
     # run through all graphs in this set
-    for index,row in dft[(dft['Variable']=='Title')].iterrows():
-        # get the set number
-        setStr = str(index).split('#')[1]
-        setNumber = int(setStr)
-        yValueName = 'yValue#'+setStr
-        yLabelName = 'yLabel#'+setStr
+    for graphSpec in sheet.graphs:
+        setStr = graphSpec.setStr
 
+        figdict, thisGraphSpecs = makeFigure(sheet, graphSpec)
 
-        thisGraphData = []
-        for (key, value) in yValueDict.items():
-            if yValueName in value:
-                thisGraphData.append(graphData[int(key)])
-
-
-        figdict = {'layout':{'title': row['Value'],
-                                'xaxis':{'title':dft.loc['xLabel','Value']},
-                                'yaxis':{'title':dft.loc[yLabelName,'Value']},
-                                },
-                    'data':thisGraphData}
+        # keep the figure and line specifications for the zoom callback
+        graphFigures[(graph, setStr)] = figdict
+        lineSpecs[(graph, setStr)] = thisGraphSpecs
+        builtRows[(graph, setStr)] = len(datafiles[sheet.datafile])
+        followRows[(graph, setStr)] = builtRows[(graph, setStr)]
 
         #----------------------------------------------------------------------------------------------
         # appends the graph blocks to the list of graphs (top, graph, bottom)
         
         # append the actual graph
-        thisGraphList.append(
-            html.Div([dcc.Graph(
-            id=graph+setStr,
-            figure=figdict,
-            style={'height': str(dft.loc['Height','Value'])},
-            )])
-        )
-
-        # graphs to disk
-        toDisk = True
-        if 'ToDisk' in dft.index:
-            if not np.isnan(dft[(dft['Variable']=='ToDisk')]['Value'].values[0]):
-                toDisk = dft[(dft['Variable']=='ToDisk')]['Value'].values[0]
-        
-        if toDisk:
-            # Save the figure to disk as html
-            import plotly.offline as offline
-            offline.plot(figdict,
-                auto_open=False, 
-                output_type='file', filename=f'{graph}#{setStr}.html', validate=False)
+        if useCallbacks:
+            # the browser fetches the figure JSON, serialized once, from /figure/<graph>/<set>/<key>
+            key = figureKey(thisSheetKey, setStr)
+            linePrecisions = [spec['precision'] for spec in thisGraphSpecs]
+            figureJSONs[key] = {'identity': figureJSON(figdict, linePrecisions)}
+            figureKeys[(graph, setStr)] = key
+            thisGraphList.append(
+                html.Div([dcc.Graph(
+                id={'type':'lineplot', 'graph':graph, 'set':setStr},
+                figure={'layout':figdict['layout'], 'data':[]},
+                style={'height': str(sheet.height)},
+                ),
+                dcc.Store(id={'type':'lineplot-figure', 'graph':graph, 'set':setStr},
+                          data=f'/figure/{urllib.parse.quote(graph)}/{setStr}/{key}'),
+                ])
+            )
+        else:
+            thisGraphList.append(
+                html.Div([dcc.Graph(
+                id={'type':'lineplot', 'graph':graph, 'set':setStr},
+                figure=figdict,
+                style={'height': str(sheet.height)},
+                )])
+            )
 
     # append the text at the bottom of the graph
-    if 'GraphBottom' in dft.index:
+    if sheet.value('GraphBottom') is not None:
         thisGraphList.append(
-            html.Div([dcc.Markdown(children=dft.loc['GraphBottom','Value'])])
+            html.Div([dcc.Markdown(children=sheet.value('GraphBottom'))])
         )
     thisGraphList.append(
         html.Div([dcc.Markdown(children=pagebottom)]),
     )  
     return thisGraphList
 
+##########################################
+#
+def sheetKey(sheet):
+    """Hash of a graph sheet's config and data, which changes when its figures change
+
+    sheet: the compiled graph sheet
+    """
+    return figureKey(pd.util.hash_pandas_object(dfg[(dfg['Graph']==sheet.name)]).values.tobytes(),
+                     pd.util.hash_pandas_object(dfc).values.tobytes(),
+                     *[dataFingerprint(datafilename) for datafilename in sheet.datafiles()], 
+                     typedArrays)
+
+##########################################
+#
+def lineSpecList(sheet, graphSpec, toDisk=False):
+    """The specifications of the lines of one graph, used to fetch and decimate them
+
+    sheet: the compiled graph sheet
+    graphSpec: the graph in the sheet
+    toDisk: if True the lines are for a html file, not decimated unless 
+            DecimateDisk is set
+
+    returns: list with a spec dict for each line
+    """
+    # point budget per line and decimation mode
+    maxPoints = int(configValue(sheet, 'MaxPoints', defaultMaxPoints))
+    decimation = str(configValue(sheet, 'Decimation', 'lttb')).lower()
+    if toDisk and not bool(configValue(sheet, 'DecimateDisk', False)):
+        maxPoints = None
+
+    # lines from other data files are aligned to the x column
+    resample = str(configValue(sheet, 'Resample', alignMethods[0])).lower()
+
+    # float precision of the line arrays sent to the browser
+    precision = str(configValue(sheet, 'Precision', precisions[0])).lower()
+
+    specs = []
+    for line in graphSpec.lines:
+        # a line from another data file
+        ydatafile = line.datafile if line.datafile != sheet.datafile else None
+        specs.append({
+            'datafile':sheet.datafile,
+            'xcolumn':sheet.xcolumn,
+            'xscale':sheet.xscale,
+            'xoffset':sheet.xoffset,
+            'ycolumn':line.column,
+            'yscale':line.scale,
+            'yoffset':line.offset,
+            'maxPoints':maxPoints,
+            'decimation':decimation,
+            'channels':sheet.channels,
+            'ydatafile':ydatafile,
+            'ytime':line.xcolumn if line.xcolumn is not None else sheet.xcolumn,
+            'resample':resample,
+            'precision':line.precision.lower() if line.precision is not None else precision,
+        })
+    return specs
+
+##########################################
+#
+def makeFigure(sheet, graphSpec, toDisk=False):
+    """Create the figure dict for one graph in a compiled graph sheet
+
+    sheet: the compiled graph sheet
+    graphSpec: the graph in the sheet
+    toDisk: if True the figure is for a html file, the lines are not decimated 
+            unless DecimateDisk is set
+
+    returns: (figure dict, list with the line specifications for the zoom callback)
+    """
+    graph = sheet.name
+    setStr = graphSpec.setStr
+
+    # lines with more points are drawn with WebGL
+    webglPoints = int(configValue(sheet, 'WebGLPoints', defaultWebGLPoints))
+
+    # build the data for all lines in this graph
+    thisGraphData = []
+    thisGraphSpecs = lineSpecList(sheet, graphSpec, toDisk)
+    for line, spec in zip(graphSpec.lines, thisGraphSpecs):
+        x, y = decimateLine(spec)
+
+        # each line in each graph must be a dict as follows:
+        dLines = {
+            'x':x,
+            'y':y,
+            'line':{}
+        }
+
+        # fill in non-default values
+        if line.width is not None:
+            dLines['line']['width'] = line.width
+
+        if line.colour is not None:
+            dLines['line']['color'] = line.colour
+
+        if line.dash is not None:
+            dLines['line']['dash'] = line.dash
+
+        if line.graphtype is not None:
+            dLines['type'] = line.graphtype
+        elif len(x) > webglPoints:
+            # svg is slow for many points
+            dLines['type'] = 'scattergl'
+
+        dLines['name'] = line.label
+        dLines['showlegend'] = True
+
+        # add this line to other lines in this graph
+        thisGraphData.append(dLines)
+
+    # uirevision keeps the zoom state when the figure is replaced after a zoom
+    figdict = {'layout':{'title': graphSpec.title,
+                            'xaxis':{'title':sheet.xlabel},
+                            'yaxis':{'title':graphSpec.ylabel},
+                            'uirevision':graph+setStr,
+                            },
+                'data':thisGraphData}
+
+    return figdict, thisGraphSpecs
+
+
+##########################################
+#
+def exportGraphs(exportdir, workers=1, graphs=None):
+    """
+    Write the graphs of the included graph sheets to html files
+
+    By default all included graph sheets are written, also those with ToDisk False.
+    The html files are written by a process pool and share one plotly.min.js.
+    Graph sheets with the same config and data hash as at the previous export
+    are skipped.  The figures are built holding graphLock, one graph sheet 
+    at a time, the files are written without it.
+
+    exportdir: folder for the html files
+    workers: the number of html files written at the same time
+    graphs: optional list of the graph sheet names to write, default all included
+    """
+    tstart = time.perf_counter()
+    if not os.path.exists(exportdir):
+        os.makedirs(exportdir)
+    writePlotlyJS(exportdir)
+
+    # hashes of the graph sheets exported before
+    manifestname = os.path.join(exportdir, 'export-hashes.json')
+    try:
+        with open(manifestname, 'r') as fin:
+            manifest = json.load(fin)
+    except (OSError, ValueError):
+        manifest = {}
+
+    tasks = {}
+    keys = {}
+    skipped = 0
+    with graphLock:
+        graphs = list(graphNames if graphs is None else graphs)
+    for graph in graphs:
+        with graphLock:
+            # e.g., removed from the config since
+            if graph not in graphSheets:
+                continue
+            sheet = graphSheets[graph]
+            # files exported with decimated lines are written again
+            key = figureKey(sheetKey(sheet), plotly.__version__, 'undecimated')
+            filenames = [os.path.join(exportdir, f'{graph}#{graphSpec.setStr}.html') 
+                         for graphSpec in sheet.graphs]
+            if manifest.get(graph, None) == key and all(os.path.exists(filename) for filename in filenames):
+                skipped = skipped + 1
+                continue
+
+            keys[graph] = key
+            for graphSpec, filename in zip(sheet.graphs, filenames):
+                tasks[filename] = (graph, makeFigure(sheet, graphSpec, toDisk=True)[0])
+
+    failed = set()
+    executor = ProcessPoolExecutor(workers) if workers > 1 else ThreadPoolExecutor(1)
+    with executor:
+        futures = {executor.submit(writeFigureHTML, figdict, filename): (graph, filename) 
+                   for filename, (graph, figdict) in tasks.items()}
+        for future in as_completed(futures):
+            graph, filename = futures[future]
+            try:
+                future.result()
+            except Exception as err:
+                print(f'Writing {filename} failed: {err}')
+                failed.add(graph)
+
+    for graph in keys:
+        if graph not in failed:
+            manifest[graph] = keys[graph]
+    tmpname = manifestname + f'.tmp{os.getpid()}'
+    with open(tmpname, 'w') as fout:
+        json.dump(manifest, fout, indent=1)
+    os.replace(tmpname, manifestname)
+
+    print(f'Exported {len(tasks)} graphs of {len(keys)} graph sheets to {exportdir}, '
+          f'skipped {skipped} unchanged graph sheets, in {time.perf_counter() - tstart:.3f} s')
+
+##########################################
+#
+def writeDiskGraphs():
+    """
+    Write the html files of the graph sheets with ToDisk (default True) to the current folder
+
+    Only the graph sheets changed since the files were written are written
+    again, see exportGraphs.
+    """
+    with diskLock:
+        with graphLock:
+            graphs = [graph for graph in graphNames if graphSheets[graph].value('ToDisk', True)]
+        if graphs:
+            exportGraphs('.', graphs=graphs)
+
+##########################################
+#
+def startDiskGraphs():
+    """
+    Write the html files of the ToDisk graph sheets in a background thread,
+    so that the tabs and callbacks do not wait for them
+    """
+    def writeGraphs():
+        try:
+            writeDiskGraphs()
+        except Exception as err:
+            print(f'Writing the html files failed: {err}')
+
+    threading.Thread(target=writeGraphs, daemon=True).start()
 
 ##########################################
 #
 def prepareGraphs():
 
+    # graphSets to be used when constructing the page
+    # each entry in this dict is a different tab containing several graphs,
+    # keyed by graph sheet name, built when the tab is first shown 
+    # and kept in least recently used order
+    global graphSets 
+    graphSets = OrderedDict()
+
+    # figures and line specifications for each graph, keyed by (graph, setStr)
+    global graphFigures
+    global lineSpecs
+    graphFigures = {}
+    lineSpecs = {}
+
+    # number of data rows in each graph when built, and in the browser's figure
+    global builtRows
+    global followRows
+    builtRows = {}
+    followRows = {}
+
+    # figure JSON served to the browser, keyed by the figure's config and data hash,
+    # as dict with the JSON for each content encoding, and the current key for each graph
+    global figureJSONs
+    global figureKeys
+    figureJSONs = {}
+    figureKeys = {}
+
+    compileGraphs()
+
+    # without callbacks all the tabs are in the page, so build them all now
+    if not useCallbacks:
+        for tabNum in range(len(graphNames)):
+            getGraphSet(tabNum)
+
+##########################################
+#
+def compileGraphs():
+    """Compile all graph sheets in dfg and list the tabs to be shown
+    """
     # get list of all graphs in dfg
     graphs = dfg['Graph'].unique()
 
-    # graphSets to be used when constructing the page
-    # each entry in this list is a different tab containing several graphs
-    global graphSets 
     global graphTabs
-    graphSets = []
+    global graphNames
     graphTabs = []
+    graphNames = []
+
+    # each graph sheet compiled once
+    global graphSheets
+    graphSheets = {}
 
     for graph in graphs:
 
         # extract info for this graph set
-        dft = dfg[(dfg['Graph']==graph)]        
+        graphSheets[graph] = compileSheet(dfg[(dfg['Graph']==graph)], graph)
         
         # First check exclude flag
-        toInclude = True
-        if 'Include' in dft.index:
-            if not np.isnan(dft[(dft['Variable']=='Include')]['Value'].values[0]):
-                toInclude = dft[(dft['Variable']=='Include')]['Value'].values[0]
+        toInclude = graphSheets[graph].value('Include', True)
 
         if toInclude:
-            graphSets.append(makeGraphSet(dft, graph))
+            graphNames.append(graph)
             graphTabs.append(graph.split('-')[1])
 
+##########################################
+#
+def getGraphSet(tabNum):
+    """The graph set for a tab, built the first time the tab is requested
+
+    Only the maxGraphSets most recently used tabs are kept, 
+    the figures of older tabs are removed and built again when next requested.
+
+    tabNum: the tab number, index into graphNames
+    """
+    with graphLock:
+        graph = graphNames[tabNum]
+        if graph in graphSets:
+            graphSets.move_to_end(graph)
+            return graphSets[graph]
+
+        tstart = time.perf_counter()
+        with profiler.stage(graph, 'sheet'):
+            graphSets[graph] = makeGraphSet(graphSheets[graph])
+        print(f'Tab {graphTabs[tabNum]} built in {time.perf_counter() - tstart:.3f} s')
+
+        # with callbacks only the shown tabs must be kept
+        while useCallbacks and len(graphSets) > maxGraphSets:
+            dropGraphSet(next(iter(graphSets)))
+
+        return graphSets[graph]
+
+##########################################
+#
+def dropGraphSet(graph):
+    """Remove a built graph set and its figures, it is built again when next requested
+
+    graph: the graph sheet name
+    """
+    with graphLock:
+        graphSets.pop(graph, None)
+        for key in [key for key in graphFigures if key[0] == graph]:
+            del graphFigures[key]
+            del lineSpecs[key]
+            del builtRows[key]
+            followRows.pop(key, None)
+            figureJSONs.pop(figureKeys.pop(key, None), None)
 
 ##########################################
 #
@@ -273,15 +1111,37 @@ def makePage():
     Create the contents to be displayed in the browser
     """
 
+    # create the page to be rendered in the browser
+    # the interval and version store are used to update the page when
+    # the watched files are reloaded
+    page = html.Div([
+        dcc.Tabs(id="tabs", value='Tab 0', children=[
+            # following is a list of dcc.Graph(() graphs
+            *makeTabs(),
+        ]),
+        html.Div(id='tabs-content'),
+        dcc.Interval(id='reload-interval', interval=int(1000 * (watchInterval or 1.)), 
+                     disabled=not (useCallbacks and (watchInterval > 0 or followInterval > 0))),
+        dcc.Store(id='page-version', data=dataVersion),
+        dcc.Interval(id='follow-interval', interval=int(1000 * (followInterval or 1.)), 
+                     disabled=not (useCallbacks and followInterval > 0)),
+    ])
+    return page
+
+##########################################
+#
+def makeTabs():
+    """
+    Create the list of tabs, one for each included graph sheet
+    """
     # lstgraphs to be used when constructing the page
     # each entry in this list is a different tab containing several graphs
     lstgraphs = []
 
-    for tabNum, tabSet in enumerate(graphSets):
+    for tabNum, tabLabel in enumerate(graphTabs):
 
         # --------------- now add to the tab
         # 
-        tabLabel = graphTabs[tabNum]
 
         if useCallbacks:
             lstgraphs.append(
@@ -289,59 +1149,280 @@ def makePage():
         else:
             lstgraphs.append(
                 dcc.Tab(value='Tab ' + str(tabNum), label=tabLabel, children=[
-                    *tabSet,
+                    *getGraphSet(tabNum),
                 ]))
 
+    # the statistics of the data columns after the graphs
+    if statisticsTab():
+        if useCallbacks:
+            lstgraphs.append(dcc.Tab(value=statsTabValue, label='Statistics'))
+        else:
+            lstgraphs.append(dcc.Tab(value=statsTabValue, label='Statistics', 
+                                     children=[makeStatsTable()]))
 
-    # create the page to be rendered in the browser
-    page = html.Div([
-        dcc.Tabs(id="tabs", value='Tab 0', children=[
-            # following is a list of dcc.Graph(() graphs
-            *lstgraphs,
-        ]),
-        html.Div(id='tabs-content'),
-    ])
-    return page
+    return lstgraphs
+
+##########################################
+#
+def statisticsTab():
+    """Check if the Statistics tab is shown, set in the header sheet
+    """
+    value = dfc.loc['Statistics','Value'] if 'Statistics' in dfc.index else False
+    if isinstance(value, pd.Series):
+        value = value.values[0]
+    return isGiven(value) and bool(value)
+
+##########################################
+#
+def statsKey(spec):
+    """The key of the statistics of a line's values
+
+    spec: dict with the line's data files, columns and alignment method
+
+    returns: (data file, column or derived channel expression, alignment key)
+    """
+    akey = alignmentKey(spec)
+    return (spec['datafile'] if akey is None else spec['ydatafile'],
+            spec['channels'].get(spec['ycolumn'], spec['ycolumn']), akey)
+
+##########################################
+#
+def lineStats(spec):
+    """The statistics of the values of a plotted line
+
+    The statistics are kept for each line values: the data file, the column 
+    or derived channel, and the alignment for a line from another data file.  
+    When rows are appended to a followed data file, only the new rows are 
+    merged into the running statistics.  The rows of an aligned line after 
+    the end of its source file are merged once the source file reaches them.
+    Lines from one data file that is not followed are kept in the cache.
+    Call holding graphLock.
+
+    spec: dict with the line's data files, columns and alignment method
+
+    returns: the summary dict, or None if the values are not numeric
+    """
+    key = statsKey(spec)
+    datafilename, ykey, akey = key
+
+    values = lineValues(spec)
+    if values.dtype.kind not in 'biuf':
+        return None
+    alignment = alignments.get(akey, None)
+    rowwise = spec['ycolumn'] not in spec['channels'] or channelExpression(ykey).rowwise
+
+    # the rows whose values do not change when rows are appended
+    numFinal = len(values)
+    if alignment is not None and len(alignment.pending) > 0:
+        numFinal = int(alignment.pending.min())
+
+    entry = lineStatistics.get(key, None)
+    cacheable = statsCache is not None and akey is None and datafilename not in tailReaders
+    variant = cacheVariant(statsDatatypes.get(datafilename, None))
+    if entry is None and cacheable:
+        summary = statsCache.loadStats(datafilename, variant).get(ykey, None)
+        if summary is not None:
+            entry = {'stats': None, 'rows': numFinal, 'alignment': None, 'summary': summary}
+            lineStatistics[key] = entry
+
+    if entry is not None and entry['rows'] == numFinal and entry['alignment'] is alignment:
+        return entry['summary']
+
+    # e.g., the alignment was computed again, or the expression depends on the other rows
+    if (entry is None or entry['stats'] is None or entry['alignment'] is not alignment
+            or entry['rows'] > numFinal or not rowwise):
+        entry = {'stats': StreamingStats(), 'rows': 0, 'alignment': alignment}
+        lineStatistics[key] = entry
+    entry['stats'].updateRows(values[entry['rows']:numFinal])
+    entry['rows'] = numFinal
+    entry['summary'] = entry['stats'].summary()
+
+    if cacheable:
+        statsCache.storeStats(datafilename, {ykey: entry['summary']}, variant)
+    return entry['summary']
+
+##########################################
+#
+def statsRows():
+    """The rows of the statistics table, one row per line values plotted in the graph sheets
+
+    Lines with the same values in several graphs get one row, the columns
+    only used to derive channels or to align lines get none.
+    Call holding graphLock.
+    """
+    names = ['count', 'nans', 'min', 'max', 'mean', 'std'] + [f'p{p}' for p in percentiles]
+    rows = []
+    keys = set()
+    for graph in graphNames:
+        sheet = graphSheets[graph]
+        for graphSpec in sheet.graphs:
+            for spec in lineSpecList(sheet, graphSpec):
+                key = statsKey(spec)
+                if key in keys:
+                    continue
+                keys.add(key)
+                summary = lineStats(spec)
+                if summary is None:
+                    continue
+
+                row = {'file': key[0], 'channel': spec['ycolumn'], 
+                       'aligned': spec['datafile'] if key[2] is not None else ''}
+                for name in names:
+                    value = summary[name]
+                    row[name] = float(f'{value:.6g}') if isinstance(value, float) else value
+                rows.append(row)
+    return rows
+
+##########################################
+#
+def makeStatsTable():
+    """Create the table with the statistics of the plotted lines, see statsRows
+    """
+    names = ['count', 'nans', 'min', 'max', 'mean', 'std'] + [f'p{p}' for p in percentiles]
+    columns = [{'name': 'Data file', 'id': 'file'}, {'name': 'Channel', 'id': 'channel'},
+               {'name': 'Aligned to', 'id': 'aligned'}]
+    columns.extend({'name': name, 'id': name, 'type': 'numeric'} for name in names)
+    return html.Div([dash_table.DataTable(
+        id='stats-table', columns=columns, data=statsRows(),
+        sort_action='native', filter_action='native', page_size=50,
+        style_table={'overflowX': 'auto'},
+        )])
 
 ##########################################
 #
 def run_dash(pageLayout,port):
     """Initiate the Dash server and serve the page
 
-    pageLayout: info the be served in Plotly data format
+    pageLayout: info to be served in Plotly data format
     port: port number to be used
     """
     # start a dash app, which also starts a Flask server
-    # global app
-    app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
-    # override security restrictions: allow the serving of local pages
-    app.css.config.serve_locally = True
-    app.scripts.config.serve_locally = True
-    app.layout = pageLayout
-
-    @app.callback(Output('tabs-content', 'children'),
-                [Input('tabs', 'value')])
-    # def update_output(tab):
-    def render_content(tab):
-        tabNum = int(tab.split(' ')[1])
-        return graphSets[tabNum]
-
+    app = createApp(pageLayout)
     app.run_server(debug=False, port=port)
 
 ##########################################
 #
-# creates a browser widget
-class WebViewer(QtWebEngineWidgets.QWebEngineView):
-    def __init__(self, parent, url):
-        """Create a web browser widget
+def createApp(pageLayout):
+    """Create the Dash app serving the page, with its callbacks and routes
+
+    app.server is the Flask WSGI app, see wsgi.py to serve it with 
+    a production WSGI server.
+
+    pageLayout: info to be served in Plotly data format
 
-        parent: the parent GUI element where this is included.
-        url: the url to be browsed
+    returns: the Dash app
+    """
+    # the graphs are only in the layout once their tab is rendered
+    app = dash.Dash(__name__, external_stylesheets=external_stylesheets,
+                    suppress_callback_exceptions=True)
+    # override security restrictions: allow the serving of local pages
+    app.css.config.serve_locally = True
+    app.scripts.config.serve_locally = True
+    app.layout = pageLayout
+    enableCompression(app.server)
+
+    # render the selected tab, and the tabs again if the files were reloaded
+    @app.callback([Output('tabs-content', 'children'), 
+                   Output('tabs', 'children'),
+                   Output('page-version', 'data')],
+                [Input('tabs', 'value'), Input('reload-interval', 'n_intervals')],
+                [State('page-version', 'data')])
+    # def update_output(tab):
+    def render_content(tab, n_intervals, pageVersion):
+        triggered = [trigger['prop_id'] for trigger in dash.callback_context.triggered]
+        if triggered == ['reload-interval.n_intervals'] and pageVersion == dataVersion:
+            raise PreventUpdate
+
+        with graphLock:
+            tabs = makeTabs() if pageVersion != dataVersion else dash.no_update
+            if tab == statsTabValue and statisticsTab():
+                return makeStatsTable(), tabs, dataVersion
+            tabNum = int(tab.split(' ')[1]) if tab != statsTabValue else 0
+            # the tab may have been removed from the config
+            if tabNum >= len(graphNames):
+                tabNum = 0
+            graphSet = getGraphSet(tabNum)
+            # the browser gets the figures as built
+            for key in builtRows:
+                if key[0] == graphNames[tabNum]:
+                    followRows[key] = builtRows[key]
+            return graphSet, tabs, dataVersion
+
+    # the startup profile ends with the first response showing the graphs
+    if profiler.enabled:
+        @app.server.after_request
+        def profileFirstResponse(response):
+            if flask.request.path == ('/_dash-update-component' if useCallbacks else '/_dash-layout'):
+                profiler.finish()
+            return response
+
+    # the figure JSON of the graphs, serialized when the graph was built
+    @app.server.route('/figure/<graph>/<setStr>/<key>')
+    def serve_figure(graph, setStr, key):
+        encoded = figureJSONs.get(key, None)
+        if encoded is None:
+            # e.g., the tab was built by another server process, or dropped
+            with graphLock:
+                if graph not in graphNames:
+                    flask.abort(404)
+                getGraphSet(graphNames.index(graph))
+                if (graph, setStr) not in figureKeys:
+                    flask.abort(404)
+                encoded = figureJSONs[figureKeys[(graph, setStr)]]
+
+        # the figure is compressed once for each content encoding
+        encoding = flask.request.accept_encodings.best_match(availableEncodings(), 'identity')
+        if encoding not in encoded:
+            encoded[encoding] = compressBody(encoded['identity'], encoding)
+
+        # the key changes with the figure
+        headers = {'Cache-Control': 'private, max-age=86400', 'Vary': 'Accept-Encoding'}
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return flask.Response(encoded[encoding], mimetype='application/json', headers=headers)
+
+    graphId = {'type':'lineplot', 'graph':MATCH, 'set':MATCH}
+    app.clientside_callback(
         """
-        super().__init__(parent)
-        page = QtWebEngineWidgets.QWebEnginePage(self)
-        self.setPage(page)
-        self.setUrl(QtCore.QUrl(url))
+        function(url) {
+            return fetch(url).then(function(response) { return response.json(); });
+        }
+        """,
+        Output(graphId, 'figure'),
+        [Input({'type':'lineplot-figure', 'graph':MATCH, 'set':MATCH}, 'data')])
+
+    # zooming a graph fetches the decimated lines over the zoomed x range,
+    # for all graphs in the tab at once if their x axes are linked
+    allGraphs = {'type':'lineplot', 'graph':ALL, 'set':ALL}
+    @app.callback(Output(allGraphs, 'figure', allow_duplicate=True),
+                [Input(allGraphs, 'relayoutData')],
+                [State(allGraphs, 'id')],
+                prevent_initial_call=True)
+    def zoom_graphs(relayoutDatas, ids):
+        zoomedId = dash.callback_context.triggered_id
+        if zoomedId is None or zoomedId not in ids:
+            raise PreventUpdate
+        return zoomGraphs(ids, relayoutDatas, zoomedId)
+
+    # the rows appended to the followed data files are added to the shown graphs
+    @app.callback(Output(allGraphs, 'extendData'),
+                [Input('follow-interval', 'n_intervals')],
+                [State(allGraphs, 'id')],
+                prevent_initial_call=True)
+    def follow_graphs(n_intervals, ids):
+        return [followData(thisId['graph'], thisId['set']) for thisId in ids]
+
+    # the statistics of the shown Statistics tab include the appended rows
+    @app.callback(Output('stats-table', 'data'),
+                [Input('follow-interval', 'n_intervals')],
+                prevent_initial_call=True)
+    def follow_stats(n_intervals):
+        if not tailReaders:
+            raise PreventUpdate
+        with graphLock:
+            return statsRows()
+
+    return app
 
 ##########################################
 #
@@ -353,84 +1434,377 @@ def loadConfig(configfile):
 
     """
 
-    # read the config file
-    cxls = pd.ExcelFile(configfile)
+    # read all sheets in the config file (or its unchanged sidecar) at once
+    cxls = readConfigWorkbook(configfile)
 
     # header dataframe
     global dfc
-    dfc = pd.read_excel(cxls, 'header')
+    dfc = cxls['header']
     dfc = dfc.set_index('Variable')
 
     # get a list of graph sheetnames (ignore the header sheet)
-    cwb =  oxl.load_workbook(configfile)
-    sheetnames = [sn for sn in cwb.sheetnames if 'graph' in sn]
-
-    # global dataframe to contain ALL the sheets' info
-    global dfg
-    dfg = pd.DataFrame()
+    sheetnames = [sn for sn in cxls if 'graph' in sn]
 
+    # collect all the sheets, to be joined once
+    sheets = []
     for shtnum,sheetname in enumerate(sheetnames):
-        dft = pd.read_excel(cxls, sheetname)
+        dft = cxls[sheetname].copy()
         # add info to identify the lines associated with this sheet
         dft['Graph'] = sheetname
         dft['ShtNum'] = shtnum
-        dft['Index'] = dft['Variable']
-
-        # determine the number of graphs on this tab
-        i = 0
-        theSet = -1
-        for index,row in dft.iterrows():
-            if 'Title' in row['Variable']:
-                theSet = theSet + 1
-                dft.loc[index,'Index'] = f"{row['Variable']}#{theSet:03d}"
-            if 'yLabel' in row['Variable']:
-                dft.loc[index,'Index'] = f"{row['Variable']}#{theSet:03d}"
-                i = 0
-            if 'yValue' in row['Variable']:
-                dft.loc[index,'Index'] = f"{row['Variable']}#{theSet:03d}-{i:03d}"
-                i = i + 1
-
-        # make 'Index' column the index
-        dft = dft.set_index('Index')
-        # append this sheet to the master data frame
-        dfg = dfg.append(dft)
+        sheets.append(dft)
+
+    # global dataframe to contain ALL the sheets' info
+    global dfg
+    dfg = pd.concat(sheets, ignore_index=True)
+
+    # determine the number of graphs on each tab:
+    # each Title starts a new graph set in the sheet and the yValues 
+    # are numbered from the preceding yLabel
+    variable = dfg['Variable'].astype(str)
+    isTitle = variable.str.contains('Title', regex=False)
+    isLabel = variable.str.contains('yLabel', regex=False)
+    isValue = variable.str.contains('yValue', regex=False)
+    theSet = isTitle.groupby(dfg['ShtNum']).cumsum() - 1
+    labelNum = isLabel.groupby(dfg['ShtNum']).cumsum()
+    lineNum = isValue.groupby([dfg['ShtNum'], labelNum]).cumsum() - 1
+
+    setStr = theSet.map('{:03d}'.format)
+    dfg['Index'] = dfg['Variable']
+    dfg.loc[isTitle | isLabel, 'Index'] = variable + '#' + setStr
+    dfg.loc[isValue, 'Index'] = variable + '#' + setStr + '-' + lineNum.map('{:03d}'.format)
+
+    # make 'Index' column the index
+    dfg = dfg.set_index('Index')
 
     # print(dfg)
 
 ##########################################
 #
-def loadData():
+def dataFileOptions():
+    """
+    The columns and the optional dtype hint for each data file in the config
+
+    returns: (usecols, datatypes) dicts with the data file names as keys
+    """
+    # only the columns used in the graphs are read from the data files
+    usecols = configColumns(dfg)
+
+    # optional dtype hints, the first Datatype given on a graph sheet applies 
+    # to the data file referenced on that sheet
+    datatypes = {}
+    for graph in dfg['Graph'].unique():
+        dft = dfg[(dfg['Graph']==graph)]
+        if 'Datatype' in dft.index and 'Datafile' in dft.index:
+            datatype = dft[(dft['Variable']=='Datatype')]['Value'].values[0]
+            datafilename = dft[(dft['Variable']=='Datafile')]['Value'].values[0]
+            if isinstance(datatype, str):
+                datatypes.setdefault(datafilename, datatype)
+
+    return usecols, datatypes
+
+##########################################
+#
+def loadDataFile(datafilename, usecols, datatype=None, cache=None, rebuildCache=False):
+    """
+    Load one telemetry data file
+
+    datafilename: the data file to be loaded
+    usecols: the names of the columns to be loaded
+    datatype: optional dtype hint passed to the text parser
+    cache: DataCache used to load/store the parsed file, or None to parse the file
+    rebuildCache: if True, parse the file and overwrite the cache entry
+
+    returns: pandas dataframe, ColumnFrame if memory mapped or TailReader for followed files
+    """
+    extension = os.path.splitext(datafilename)[1]
+
+    # followed text files are read incrementally, not cached
+    if followInterval > 0 and 'mat' not in extension:
+        reader = TailReader(datafilename, usecols=usecols, dtype=datatype)
+        reader.read()
+        tailReaders[datafilename] = reader
+        return reader
+
+    # try the cache first, the dtype hint is part of the cache key
+    if cache is not None and not rebuildCache:
+        df = cache.load(datafilename, cacheVariant(datatype), usecols=usecols, mmap=useMmap)
+        if df is not None:
+            return df
+
+    # read the gtv matlab file, or the text file sniffing the separator to use the fast parser
+    df = readTelemetryFile(datafilename, usecols=usecols, dtype=datatype)
+
+    return keepDataFile(datafilename, df, usecols, datatype, cache)
+
+##########################################
+#
+def cacheVariant(datatype):
+    """The cache variant string for a data file's dtype hint
+    """
+    return str(datatype if datatype is not None else '')
+
+##########################################
+#
+def keepDataFile(datafilename, df, usecols, datatype=None, cache=None):
+    """
+    Store a parsed data file in the cache, and memory map it if requested
+
+    datafilename: the data file name
+    df: the parsed data file
+    usecols: the names of the columns loaded
+    datatype: optional dtype hint used to parse the file
+    cache: DataCache used to store the parsed file, or None
+
+    returns: pandas dataframe, or ColumnFrame if memory mapped
+    """
+    variant = cacheVariant(datatype)
+    if cache is not None:
+        cache.store(datafilename, df, variant)
+
+        # replace the parsed data in memory with the memory mapped columns
+        if useMmap:
+            dfmap = cache.load(datafilename, variant, usecols=usecols, mmap=True)
+            if dfmap is not None:
+                df = dfmap
+
+    return df
+
+##########################################
+#
+def loadData(cache=None, rebuildCache=False, workers=1):
     """
     Load all the telemetry data from all files required
+
+    With more than one worker the files are loaded at the same time.  
+    Text files parsed by the C or python parser (which hold the GIL) are 
+    parsed in a process pool, all other files (in the cache, pyarrow, matlab
+    or followed) are loaded in a thread pool.
+
+    cache: DataCache used to load/store the parsed files, or None to parse all files
+    rebuildCache: if True, parse all files and overwrite the cache entries
+    workers: the number of files loaded at the same time
     """
 
-    # get data filenames in all the graphs
-    datafilenames = dfg[(dfg['Variable']=='Datafile')]['Value'].unique()
+    # get data filenames in all the graphs, also those of lines from other files
+    usecols, datatypes = dataFileOptions()
+    datafilenames = list(usecols)
 
     global datafiles
     datafiles = {}
-
+    tailReaders.clear()
+
+    # sorted state of the x columns and the number of rows checked
+    global sortedColumns
+    sortedColumns = {}
+
+    # derived channel values and number of rows, keyed by data file and expression
+    global derivedColumns
+    derivedColumns = {}
+
+    # alignments of the lines from other data files, and the aligned columns
+    global alignments
+    global alignedColumns
+    alignments = {}
+    alignedColumns = {}
+
+    tstart = time.perf_counter()
+    loaded = {}
+
+    def progress(datafilename):
+        print(f'Loaded {len(loaded)}/{len(datafilenames)} {datafilename} '
+              f'at {time.perf_counter() - tstart:.3f} s')
+
+    # the statistics of the plotted lines, computed when the Statistics tab is shown,
+    # with the cache and the dtype hints (cache variants) of the data files
+    global lineStatistics
+    global statsCache
+    global statsDatatypes
+    lineStatistics = {}
+    statsCache = cache
+    statsDatatypes = datatypes
+
+    def loadProfiled(datafilename):
+        with profiler.stage(datafilename, 'datafile'):
+            return loadDataFile(datafilename, usecols[datafilename], 
+                                datatypes.get(datafilename, None), cache, rebuildCache)
+
+    workers = min(workers, len(datafilenames))
+    if workers <= 1:
+        for datafilename in datafilenames:
+            loaded[datafilename] = loadProfiled(datafilename)
+            progress(datafilename)
+
+    else:
+        # files to be parsed by the parsers holding the GIL
+        inProcess = [datafilename for datafilename in datafilenames 
+                     if followInterval == 0 and holdsGIL(datafilename) and
+                     (cache is None or rebuildCache or 
+                      not cache.has(datafilename, cacheVariant(datatypes.get(datafilename, None)), 
+                                    usecols[datafilename]))]
+
+        # the processes are started before the threads
+        with ProcessPoolExecutor(workers) as processes, ThreadPoolExecutor(workers) as threads:
+            futures = {}
+            # the files parsed in another process are timed from submit to kept
+            inProcessRecords = {}
+            for datafilename in inProcess:
+                inProcessRecords[datafilename] = profiler.start(datafilename, 'datafile', cpu=False)
+                futures[processes.submit(readTelemetryFile, datafilename, usecols[datafilename], 
+                                         datatypes.get(datafilename, None))] = datafilename
+            for datafilename in datafilenames:
+                if datafilename not in inProcess:
+                    futures[threads.submit(loadProfiled, datafilename)] = datafilename
+
+            for future in as_completed(futures):
+                datafilename = futures[future]
+                df = future.result()
+                if datafilename in inProcess:
+                    df = keepDataFile(datafilename, df, usecols[datafilename], 
+                                      datatypes.get(datafilename, None), cache)
+                    profiler.stop(inProcessRecords[datafilename])
+                loaded[datafilename] = df
+                progress(datafilename)
+
+    # in the order of the config
     for datafilename in datafilenames:
-        extension = os.path.splitext(datafilename)[1]
+        datafiles[datafilename] = loaded[datafilename]
 
-        if 'mat' in extension:
+    # keep the cache within its size limit
+    if cache is not None:
+        cache.evict()
 
-            # load the gtv telemetry data in matlab format file
-            # scipy reads in structures as structured numpy arrays of dtype object
-            from scipy.io import loadmat
-            dataMat = loadmat(datafilename)
+##########################################
+#
+def fileStamps(configfile):
+    """
+    The modification time and size of the config file and all data files
 
-            # create the dataframe
-            datafiles[datafilename] = pd.DataFrame(dataMat['DATA'], columns=dataMat['NAM'])
+    configfile: Excel file that defines the plots
+    """
+    stamps = {}
+    # the followed data files are read by followFiles
+    for filename in [configfile, *[name for name in datafiles if name not in tailReaders]]:
+        try:
+            stat = os.stat(filename)
+            stamps[filename] = (stat.st_mtime, stat.st_size)
+        except OSError:
+            # e.g., the file is being replaced
+            stamps[filename] = None
+    return stamps
+
+##########################################
+#
+def reloadFiles(configfile, changed, cache=None):
+    """
+    Reload the changed config and data files, and drop the affected graph sets
+
+    configfile: Excel file that defines the plots
+    changed: list of the changed file names
+    cache: DataCache used to load/store the parsed files
+    """
+    global dataVersion
+
+    with graphLock:
+        changedGraphs = set()
+
+        if configfile in changed:
+            # reload the config, only the sheets that changed must be rebuilt
+            oldDfg = dfg
+            oldDfc = dfc
+            loadConfig(configfile)
+            for graph in set(oldDfg['Graph']) | set(dfg['Graph']):
+                if not oldDfg[(oldDfg['Graph']==graph)].equals(dfg[(dfg['Graph']==graph)]):
+                    changedGraphs.add(graph)
+            # the header sheet variables (MaxPoints, PageTop, ...) apply to all sheets
+            if not oldDfc.equals(dfc):
+                changedGraphs.update(set(oldDfg['Graph']) | set(dfg['Graph']))
+            compileGraphs()
+
+        # reload the changed data files, and those with new columns in the config
+        usecols, datatypes = dataFileOptions()
+        statsDatatypes.clear()
+        statsDatatypes.update(datatypes)
+        for datafilename in usecols:
+            if datafilename in changed or datafilename not in datafiles or \
+                    not usecols[datafilename].issubset(datafiles[datafilename].columns):
+                datafiles[datafilename] = loadDataFile(datafilename, usecols[datafilename],
+                                                       datatypes.get(datafilename, None), cache)
+                forgetColumns(datafilename)
+                changedGraphs.update(graph for graph, sheet in graphSheets.items() 
+                                     if datafilename in sheet.datafiles())
+
+        # data files no longer in the config
+        for datafilename in [datafilename for datafilename in datafiles if datafilename not in usecols]:
+            del datafiles[datafilename]
+            tailReaders.pop(datafilename, None)
+            forgetColumns(datafilename)
+
+        # graph sets of changed and removed sheets
+        for graph in changedGraphs | (set(graphSets) - set(graphNames)):
+            dropGraphSet(graph)
+
+        dataVersion = dataVersion + 1
+
+    print(f'Reloaded {", ".join(changed)}, graphs to be rebuilt: {", ".join(sorted(changedGraphs))}')
+    startDiskGraphs()
+
+##########################################
+#
+def watchFiles(configfile, interval, cache=None):
+    """
+    Poll the config and data files and reload the files that changed
+
+    configfile: Excel file that defines the plots
+    interval: time in seconds between polls
+    cache: DataCache used to load/store the parsed files
+    """
+    stamps = fileStamps(configfile)
+    while True:
+        time.sleep(interval)
+        newStamps = fileStamps(configfile)
+        changed = [filename for filename in newStamps if newStamps[filename] != stamps.get(filename)]
+        if not changed:
+            continue
+        try:
+            reloadFiles(configfile, changed, cache)
+        except Exception as err:
+            # e.g., a file that is still being written, try again at the next poll
+            print(f'Reload of {", ".join(changed)} failed: {err}')
+            continue
+        # the config may have added or removed data files
+        stamps = fileStamps(configfile)
+
+##########################################
+#
+def followFiles(interval):
+    """
+    Read the rows appended to the followed data files
+
+    interval: time in seconds between reads
+    """
+    global dataVersion
+
+    while True:
+        time.sleep(interval)
+        with graphLock:
+            for datafilename, reader in list(tailReaders.items()):
+                numRows = len(reader)
+                try:
+                    reader.read()
+                except Exception as err:
+                    # e.g., a row with missing fields, try again at the next read
+                    print(f'Reading {datafilename} failed: {err}')
+                    continue
+
+                if len(reader) < numRows:
+                    # the file was restarted, rebuild its graphs and the page
+                    forgetColumns(datafilename)
+                    for graph, sheet in graphSheets.items():
+                        if datafilename in sheet.datafiles():
+                            dropGraphSet(graph)
+                    dataVersion = dataVersion + 1
 
-            # set begin of ATP as time zero
-            counter = datafiles[datafilename]['host_bfAtpEvents'][datafiles[datafilename]['host_bfAtpEvents'] == 1].index.values.astype(int)[0]
-            datafiles[datafilename]['TIME'] = datafiles[datafilename]['TIME'] - datafiles[datafilename]['TIME'][counter]
-            
-        else:
-            # read the data file
-            datafiles[datafilename] = pd.read_csv(datafilename, sep="\s+|,|;", index_col=None,engine='python')
- 
 ##########################################
 #
 if __name__ == "__main__":
@@ -448,7 +1822,7 @@ if __name__ == "__main__":
     options = """pyqt-dash-lineplot.py
 
         Usage:
-          pyqt-dash-lineplot.py [--configfile=<configFilename>] [--nocallback] [-n] 
+          pyqt-dash-lineplot.py [--configfile=<configFilename>] [--nocallback] [-n] [--no-cache | --rebuild-cache] [--cachedir=<dir>] [--cachesize=<MB>] [--tabcache=<n>] [--watch=<seconds>] [--follow=<seconds>] [--mmap] [--convert] [--workers=<n>] [--export-only] [--exportdir=<dir>] [--export-workers=<n>] [--headless] [--profile] [--profile-stats=<file>] [--profile-trace=<file>]
           pyqt-dash-lineplot.py -h | --help 
           pyqt-dash-lineplot.py -n | --nocallback
  
@@ -456,41 +1830,124 @@ if __name__ == "__main__":
           -h, --help                           Show this screen.
           -n, --nocallback                     Run app with callbacks or not default: False].         
           -f <configFilename>, --configfile <configFilename>    Excel config filename [default: ./pyqt-dash-config.xlsx].
+          --no-cache                           Do not use the parsed data cache, parse all data files.
+          --rebuild-cache                      Parse all data files and rewrite the cache.
+          --cachedir <dir>                     Folder for the parsed data cache [default: ./.dashcache].
+          --cachesize <MB>                     Maximum size of the parsed data cache in MB [default: 2048].
+          --tabcache <n>                       Number of built tabs kept in memory [default: 8].
+          --watch <seconds>                    Reload changed config and data files, checked every <seconds> [default: 0].
+          --follow <seconds>                   Add the rows appended to the text data files every <seconds> [default: 0].
+          --mmap                               Memory map the data columns from the cache instead of loading them.
+          --convert                            Write the data files to the cache and exit.
+          --workers <n>                        Number of data files loaded at the same time, 0 for the number of CPUs [default: 1].
+          --export-only                        Write the graphs to html files in --exportdir and exit.
+          --exportdir <dir>                    Folder for the --export-only html files [default: .].
+          --export-workers <n>                 Number of --export-only html files written at the same time, 0 for the number of CPUs [default: 0].
+          --headless                           Only serve the page, without the PyQt browser.
+          --profile                            Print the time and memory of each startup stage, data file and graph sheet.
+          --profile-stats <file>               With --profile, write the cProfile statistics to <file>.
+          --profile-trace <file>               With --profile, write a Chrome trace JSON to <file>.
  
     """
     # process commandline arguments
     optionArguments = docopt(options)
 
+    tstart = time.perf_counter()
+
+    # startup stage profiler, also enabled by its output files
+    profiler = StageProfiler(optionArguments["--profile"] or 
+                             bool(optionArguments["--profile-stats"] or optionArguments["--profile-trace"]),
+                             statsfile=optionArguments["--profile-stats"], 
+                             tracefile=optionArguments["--profile-trace"])
+
     # make callbacks flag global
-    global useCallbacks
     useCallbacks = not optionArguments["--nocallback"]
 
-    sys.argv.append("--disable-web-security")
-    
+    # number of tabs kept in memory when using callbacks
+    maxGraphSets = max(1, int(optionArguments["--tabcache"]))
+
+    # file watcher poll interval, only with callbacks
+    watchInterval = float(optionArguments["--watch"])
+    if watchInterval > 0 and not useCallbacks:
+        print('--watch requires callbacks, the files will not be watched')
+        watchInterval = 0
+
+    # growing data files read interval, only with callbacks
+    followInterval = float(optionArguments["--follow"])
+    if followInterval > 0 and not useCallbacks:
+        print('--follow requires callbacks, the files will not be followed')
+        followInterval = 0
+
+    # memory mapped columns are read from the cache
+    useMmap = optionArguments["--mmap"]
+    if useMmap and optionArguments["--no-cache"]:
+        print('--mmap requires the cache, the data files will be loaded')
+        useMmap = False
+
     port = '8050' # used for the local Flask server
 
     # Excel file that defines the plots
     configfile = optionArguments["--configfile"]
-    loadConfig(configfile)
+    with profiler.stage('loadConfig'):
+        loadConfig(configfile)
 
     # load all data to be available globally 
     # all the data files, but only once into a dict with filename as key
-    loadData()
+    cache = None
+    if not optionArguments["--no-cache"]:
+        cache = DataCache(optionArguments["--cachedir"], 
+                          maxsize=int(float(optionArguments["--cachesize"]) * 1024**2))
+    workers = int(optionArguments["--workers"]) or os.cpu_count()
+    with profiler.stage('loadData'):
+        loadData(cache, rebuildCache=optionArguments["--rebuild-cache"], workers=workers)
+
+    # only convert the data files for later use with --mmap
+    if optionArguments["--convert"]:
+        print(f'Data files written to {optionArguments["--cachedir"]} in {time.perf_counter() - tstart:.3f} s')
+        profiler.finish()
+        sys.exit(0)
+
+    # only write the graphs to html files, without the server
+    if optionArguments["--export-only"]:
+        with profiler.stage('compileGraphs'):
+            compileGraphs()
+        with profiler.stage('exportGraphs'):
+            exportGraphs(optionArguments["--exportdir"], 
+                         int(optionArguments["--export-workers"]) or os.cpu_count())
+        profiler.finish()
+        sys.exit(0)
     
     # prepare all required graph sets
-    prepareGraphs()
+    with profiler.stage('prepareGraphs'):
+        prepareGraphs()
   
     # now create the page we want to render
-    pageLayout = makePage() 
+    with profiler.stage('makePage'):
+        pageLayout = makePage() 
+    print(f'Startup (config, data and page) took {time.perf_counter() - tstart:.3f} s')
+
+    # the html files of the ToDisk graph sheets
+    startDiskGraphs()
+
+    # until the first response showing the graphs, the profile is then reported
+    profiler.start('firstResponse')
+
+    # watch the config and data files
+    if watchInterval > 0:
+        threading.Thread(target=watchFiles, args=(configfile, watchInterval, cache), daemon=True).start()
+
+    # follow the growing data files
+    if followInterval > 0:
+        threading.Thread(target=followFiles, args=(followInterval,), daemon=True).start()
+
+    # only the server, in the main thread
+    if optionArguments["--headless"]:
+        app = createApp(pageLayout)
+        reportFirstRequest(app, tstart)
+        app.run_server(debug=False, port=port)
+        sys.exit(0)
 
     # start the thread
     threading.Thread(target=run_dash, args=(pageLayout,port), daemon=True).start()
 
-    # start main app with the widget rendering what is available on the port
-    appMain = QtWidgets.QApplication(sys.argv)
-    main_widget = QtWidgets.QWidget(None)
-    window_layout = QtWidgets.QVBoxLayout(main_widget)
-    window_layout.addWidget(WebViewer(main_widget,f'http://127.0.0.1:{port}'))
-    main_widget.show()
-
-    sys.exit(appMain.exec_())
+    sys.exit(runViewer(port))
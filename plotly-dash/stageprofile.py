@@ -0,0 +1,199 @@
+"""
+Startup stage profiler for the pyqt-dash scripts.
+
+A StageProfiler records the wall time, CPU time and peak memory of the
+startup stages (loadConfig, loadData, ...) and of the items within a stage
+(each data file, each graph sheet), so that a slow startup can be traced
+to a specific data file or graph sheet.
+
+Stages are timed with the process CPU time (all threads), items with the
+CPU time of the thread that runs them.  Items run in another process
+(e.g., a data file parsed in a process pool) have no CPU time here.
+The peak memory is traced with tracemalloc, which includes the numpy
+arrays but not the memory allocated by pyarrow or PyQt.  Items running
+at the same time share the same peak.
+
+The report prints a summary table, and optionally writes the cProfile
+statistics of the main thread (read with pstats or snakeviz) and a
+Chrome trace file (open in chrome://tracing or https://ui.perfetto.dev).
+
+This module only uses the standard library.
+"""
+
+import os
+import json
+import time
+import threading
+import tracemalloc
+import cProfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+##########################################
+#
+@dataclass(eq=False)
+class ProfileRecord:
+    """One timed stage or item
+    """
+    __slots__ = ('name', 'category', 'parent', 'thread', 'wall', 'cpu', 'peak',
+                 'wallStart', 'cpuStart', 'memStart', 'cpuClock')
+    name: str
+    category: str
+    parent: str
+    thread: int
+    wall: float
+    cpu: float
+    peak: int
+    wallStart: float
+    cpuStart: float
+    memStart: int
+    cpuClock: object
+
+##########################################
+#
+class StageProfiler:
+    """Records the startup stages and their items, does nothing if not enabled
+
+    enabled: if False, start/stop/stage do nothing
+    statsfile: filename for the cProfile statistics, or None
+    tracefile: filename for the Chrome trace JSON, or None
+    """
+
+    def __init__(self, enabled=False, statsfile=None, tracefile=None):
+        self.enabled = enabled
+        self.statsfile = statsfile
+        self.tracefile = tracefile
+        self.records = []
+        self.active = []
+        self.reported = False
+        self.lock = threading.Lock()
+        self.tstart = time.perf_counter()
+        self.profile = None
+
+        if enabled:
+            tracemalloc.start()
+            if statsfile:
+                self.profile = cProfile.Profile()
+                self.profile.enable()
+
+    def foldPeak(self):
+        """Add the traced peak since the last reset to the active records and reset it
+        """
+        peak = tracemalloc.get_traced_memory()[1]
+        for record in self.active:
+            record.peak = max(record.peak, peak)
+        tracemalloc.reset_peak()
+
+    def start(self, name, category='stage', cpu=True):
+        """Start timing a stage, or an item in the current stage
+
+        name: the stage name, or the item name (e.g., data file name)
+        category: 'stage' or the item type (e.g., 'datafile', 'sheet')
+        cpu: False if the work is not done by this thread (e.g., in another process)
+
+        returns: the record to be passed to stop, None if not enabled
+        """
+        if not self.enabled:
+            return None
+
+        with self.lock:
+            self.foldPeak()
+            stages = [record.name for record in self.active if record.category == 'stage']
+            cpuClock = None
+            if cpu:
+                cpuClock = time.process_time if category == 'stage' else time.thread_time
+            record = ProfileRecord(name=name, category=category,
+                                   parent=stages[-1] if stages and category != 'stage' else None,
+                                   thread=threading.get_ident(), wall=None, cpu=None, peak=0,
+                                   wallStart=time.perf_counter(),
+                                   cpuStart=cpuClock() if cpuClock else None,
+                                   memStart=tracemalloc.get_traced_memory()[0],
+                                   cpuClock=cpuClock)
+            self.active.append(record)
+            return record
+
+    def stop(self, record):
+        """Stop timing a stage or item started with start
+        """
+        if record is None or record not in self.active:
+            return
+
+        with self.lock:
+            record.wall = time.perf_counter() - record.wallStart
+            if record.cpuClock is not None:
+                record.cpu = record.cpuClock() - record.cpuStart
+            self.foldPeak()
+            record.peak = max(record.peak - record.memStart, 0)
+            self.active.remove(record)
+            self.records.append(record)
+
+    @contextmanager
+    def stage(self, name, category='stage'):
+        """Time the code in a with block as a stage or item, see start
+        """
+        record = self.start(name, category)
+        try:
+            yield record
+        finally:
+            self.stop(record)
+
+    def finish(self):
+        """Stop the stages still running and report, only the first time
+        """
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+
+        for record in list(self.active):
+            self.stop(record)
+        if self.profile is not None:
+            self.profile.disable()
+
+        self.report()
+
+        # tracing slows down the allocations, no more records are reported
+        tracemalloc.stop()
+        self.enabled = False
+
+    def report(self):
+        """Print the summary table and write the statistics and trace files
+        """
+        print(f'{"Stage":50s} {"Wall [s]":>9s} {"CPU [s]":>9s} {"Peak [MB]":>10s}')
+        stages = [record for record in self.records if record.category == 'stage']
+        for stage in sorted(stages, key=lambda record: record.wallStart):
+            print(self.formatRecord(stage, stage.name))
+            items = [record for record in self.records if record.parent == stage.name]
+            for item in sorted(items, key=lambda record: record.wall, reverse=True):
+                print(self.formatRecord(item, f'  {item.category} {item.name}'))
+
+        if self.statsfile:
+            self.profile.dump_stats(self.statsfile)
+            print(f'cProfile statistics written to {self.statsfile}')
+
+        if self.tracefile:
+            self.writeTrace(self.tracefile)
+            print(f'Chrome trace written to {self.tracefile}')
+
+    def formatRecord(self, record, label):
+        """One line of the summary table
+        """
+        cpu = f'{record.cpu:9.3f}' if record.cpu is not None else f'{"-":>9s}'
+        return f'{label[:50]:50s} {record.wall:9.3f} {cpu} {record.peak / 1024**2:10.1f}'
+
+    def writeTrace(self, filename):
+        """Write the records as complete events in the Chrome trace event format
+        """
+        events = []
+        for record in self.records:
+            events.append({
+                'name': record.name,
+                'cat': record.category,
+                'ph': 'X',
+                'ts': (record.wallStart - self.tstart) * 1e6,
+                'dur': record.wall * 1e6,
+                'pid': os.getpid(),
+                'tid': record.thread,
+                'args': {'cpu': record.cpu, 'peakMB': record.peak / 1024**2},
+                })
+        with open(filename, 'w') as fout:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, fout)
@@ -0,0 +1,740 @@
+"""
+Telemetry data file readers shared by the pyqt-dash scripts.
+
+The simulator and telemetry files used by the dash viewers are text files
+with one header line of column names, followed by rows of numbers.  Some
+files are separated by whitespace, others by commas or semicolons.  The
+original scripts read all of these with a regular expression separator,
+which forces pandas to use the slow pure-Python parser.
+
+Here the separator is determined once per file from the first few lines,
+after which the fast C (or pyarrow, if installed) parser is used.
+If the separator cannot be determined consistently the reader falls back
+to the original regular expression separator.
+
+Parsed data files can be kept in an on-disk cache (DataCache) with one
+.npy file per column, so that unchanged data files are not parsed again.
+The cached columns can also be memory mapped into a ColumnFrame, so that
+only the pages actually used are read into memory, and processes using
+the same files share the operating system's page cache.
+
+Text data files that are appended to while a simulation runs can be read
+incrementally with a TailReader, which only parses the rows appended since
+the previous read into growable column buffers.
+
+This module requires numpy and pandas, pyarrow is optional.  Matlab files
+require scipy, or h5py for matlab v7.3 files.
+"""
+
+import io
+import os
+import re
+import time
+import json
+import shutil
+import hashlib
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# separator used when the file layout cannot be determined
+regexSeparator = r'\s+|,|;'
+
+##########################################
+#
+def sniffSeparator(datafilename, numLines=10):
+    """Determine the column separator used in a text data file
+
+    datafilename: the file to be read
+    numLines: the number of lines (header included) used to sniff the separator
+
+    returns: the separator as a string, a whitespace pattern for whitespace separated files
+             or None if the separator could not be determined consistently
+    """
+    lines = []
+    with open(datafilename, 'r', errors='replace') as fin:
+        for line in fin:
+            if line.strip():
+                lines.append(line.strip())
+            if len(lines) >= numLines:
+                break
+
+    if not lines:
+        return None
+
+    for sep in [',', ';', r'\s+']:
+        # all lines must have the same number of fields
+        counts = set(len(re.split(sep, line)) for line in lines)
+        if len(counts) == 1 and counts.pop() > 1:
+            # the other separators may not appear in the data fields
+            fields = [field for line in lines for field in re.split(sep, line)]
+            if sep == r'\s+' and any((',' in f or ';' in f) for f in fields):
+                continue
+            return sep
+
+    return None
+
+##########################################
+#
+def haveArrow():
+    """Check if the pyarrow csv engine is available to pandas
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        return False
+    return True
+
+##########################################
+#
+def readDataFile(datafilename, dtype=None, engine=None, usecols=None):
+    """Read a text telemetry file into a pandas dataframe
+
+    datafilename: the file to be read
+    dtype: optional dtype (or dict of column:dtype) passed to the parser
+    engine: force a pandas parser engine, default choose the fastest available
+    usecols: optional list of the column names to be read, default read all
+
+    returns: pandas dataframe with one column per data channel
+    """
+    if usecols is not None:
+        usecols = list(usecols)
+
+    sep = sniffSeparator(datafilename)
+
+    if sep is None:
+        # unknown layout, use the slow but tolerant parser
+        return pd.read_csv(datafilename, sep=regexSeparator, index_col=None,
+                           engine='python', dtype=dtype, usecols=usecols)
+
+    if engine is None:
+        # pyarrow only supports single character separators
+        engine = 'pyarrow' if sep in [',', ';'] and haveArrow() else 'c'
+
+    return pd.read_csv(datafilename, sep=sep, index_col=None, engine=engine, 
+                       dtype=dtype, usecols=usecols)
+
+##########################################
+#
+def isHDF5File(datafilename):
+    """Check if a file is a HDF5 file, e.g., a matlab v7.3 file
+
+    Matlab v7.3 files are HDF5 files with a 512 byte header.
+    """
+    with open(datafilename, 'rb') as fin:
+        for pos in [0, 512]:
+            fin.seek(pos)
+            if fin.read(8) == b'\x89HDF\r\n\x1a\n':
+                return True
+    return False
+
+##########################################
+#
+def columnBlock(readColumn, numRows, columns, dtype=float):
+    """Read data columns one at a time into a single Fortran ordered array
+
+    Each column of the array is contiguous, so that the array is wrapped 
+    by a pandas dataframe without copying and column access is fast.
+
+    readColumn: function returning the values of a column, given its name
+    numRows: the number of rows in each column
+    columns: the names of the columns to be read
+    dtype: the array dtype
+
+    returns: numpy array with shape (numRows, len(columns))
+    """
+    block = np.empty((numRows, len(columns)), dtype=dtype, order='F')
+    for j, column in enumerate(columns):
+        block[:, j] = readColumn(column)
+    return block
+
+##########################################
+#
+def matChars(codes):
+    """A matlab char array as string
+    """
+    return ''.join(chr(code) for code in np.ravel(codes)).strip(' \x00')
+
+##########################################
+#
+def readMatFile(datafilename, usecols=None):
+    """Read a GTV telemetry file in matlab format into a pandas dataframe
+
+    The file contains a DATA matrix with one column per channel and
+    a NAM array with the channel names.  Time zero is set at the start of ATP,
+    the first sample where host_bfAtpEvents is 1 (or the first sample if 
+    there is no such sample).
+
+    Matlab v7.3 (HDF5) files are read with h5py, reading only the required
+    channels from the file.  Older files are read with scipy.  Without 
+    usecols the DATA matrix read by scipy is used by the dataframe without
+    copying it.
+
+    datafilename: the file to be read
+    usecols: optional list of the column names to be kept, default keep all
+
+    returns: pandas dataframe with one column per data channel
+    """
+    if isHDF5File(datafilename):
+        return readMat73File(datafilename, usecols)
+
+    # scipy reads in structures as structured numpy arrays of dtype object
+    from scipy.io import loadmat
+    dataMat = loadmat(datafilename, variable_names=['DATA', 'NAM'])
+    data = dataMat['DATA']
+    names = [str(name).strip() for name in dataMat['NAM']]
+
+    # set begin of ATP as time zero, argmax stops at the first event
+    events = data[:, names.index('host_bfAtpEvents')]
+    time0 = data[np.argmax(events == 1), names.index('TIME')]
+
+    if usecols is None:
+        # shift in place and use the matrix as is
+        data[:, names.index('TIME')] -= time0
+        return pd.DataFrame(data, columns=names, copy=False)
+
+    # only copy the required columns out of the DATA matrix
+    columns = [name for name in names if name in usecols]
+    position = {name: names.index(name) for name in columns}
+    block = columnBlock(lambda name: data[:, position[name]], data.shape[0], columns, data.dtype)
+    if 'TIME' in columns:
+        block[:, columns.index('TIME')] -= time0
+    return pd.DataFrame(block, columns=columns, copy=False)
+
+##########################################
+#
+def readMat73File(datafilename, usecols=None):
+    """Read a GTV telemetry file in matlab v7.3 (HDF5) format into a pandas dataframe
+
+    Matlab stores matrices column by column, so that each DATA channel is 
+    a contiguous row of the HDF5 dataset and only the required channels 
+    are read from the file.  See readMatFile.
+
+    datafilename: the file to be read
+    usecols: optional list of the column names to be read, default read all
+
+    returns: pandas dataframe with one column per data channel
+    """
+    import h5py
+    with h5py.File(datafilename, 'r') as fin:
+        # the names are in a char matrix or in a cell array of char arrays
+        nam = fin['NAM'][()]
+        if nam.dtype == h5py.ref_dtype:
+            names = [matChars(fin[ref][()]) for ref in nam.ravel()]
+        else:
+            names = [matChars(nam[:, j]) for j in range(nam.shape[1])]
+
+        # DATA has one row per channel
+        data = fin['DATA']
+
+        # set begin of ATP as time zero, argmax stops at the first event
+        events = data[names.index('host_bfAtpEvents'), :]
+        time0 = data[names.index('TIME'), int(np.argmax(events == 1))]
+
+        columns = [name for name in names if usecols is None or name in usecols]
+        position = {name: names.index(name) for name in columns}
+        block = columnBlock(lambda name: data[position[name], :], data.shape[1], columns, data.dtype)
+
+    if 'TIME' in columns:
+        block[:, columns.index('TIME')] -= time0
+    return pd.DataFrame(block, columns=columns, copy=False)
+
+##########################################
+#
+def readTelemetryFile(datafilename, usecols=None, dtype=None):
+    """Read a text or GTV matlab telemetry file into a pandas dataframe
+
+    datafilename: the file to be read, files with 'mat' in the extension are matlab files
+    usecols: optional list of the column names to be read, default read all
+    dtype: optional dtype (or dict of column:dtype) passed to the text parser
+
+    returns: pandas dataframe with one column per data channel
+    """
+    if 'mat' in os.path.splitext(datafilename)[1]:
+        return readMatFile(datafilename, usecols=usecols)
+    return readDataFile(datafilename, dtype=dtype, usecols=usecols)
+
+##########################################
+#
+def holdsGIL(datafilename):
+    """Check if a data file is read by a parser that holds the GIL
+
+    The C and python text parsers run in a single thread and hold the GIL,
+    so that reading several such files at once requires separate processes.
+    The pyarrow parser and the matlab reader release the GIL.
+
+    datafilename: the file to be read
+    """
+    if 'mat' in os.path.splitext(datafilename)[1]:
+        return False
+    return not (sniffSeparator(datafilename) in [',', ';'] and haveArrow())
+
+##########################################
+#
+def configColumns(dfg):
+    """Determine the data columns used by the graph config, for each data file
+
+    The derived channels defined in a graph sheet (Channel rows, see 
+    channelexpr.py) are replaced by the columns used in their expressions.
+    yValue rows with a Datafile cell use that data file, with the time 
+    column in their xValue cell or else the sheet's xValue.
+
+    dfg: dataframe with all graph sheets' info, with Variable, Value and Graph columns
+
+    returns: dict with data filename as key and a set of column names as value
+    """
+    from channelexpr import parseChannel, channelExpression
+
+    usecols = {}
+    for graph in dfg['Graph'].unique():
+        dft = dfg[(dfg['Graph']==graph)]
+        datafilename = dft[(dft['Variable']=='Datafile')]['Value'].values[0]
+        channels = dict(parseChannel(value) for value in dft[(dft['Variable']=='Channel')]['Value'])
+        xcolumns = list(dft[(dft['Variable']=='xValue')]['Value'].dropna().astype(str))
+
+        def useColumn(datafilename, column):
+            columns = usecols.setdefault(datafilename, set())
+            if column in channels:
+                columns.update(channelExpression(channels[column]).columns)
+            else:
+                columns.add(column)
+
+        usecols.setdefault(datafilename, set())
+        for column in xcolumns:
+            useColumn(datafilename, column)
+        for row in dft[(dft['Variable']=='yValue')].dropna(subset=['Value']).to_dict('records'):
+            linefile = row.get('Datafile', None)
+            if isinstance(linefile, str):
+                # a line from another data file, with its own time column
+                xcolumn = row.get('xValue', None)
+                if isinstance(xcolumn, str):
+                    useColumn(linefile, xcolumn)
+                elif xcolumns:
+                    useColumn(linefile, xcolumns[0])
+                useColumn(linefile, str(row['Value']))
+            else:
+                useColumn(datafilename, str(row['Value']))
+    return usecols
+
+##########################################
+#
+def fileDigest(datafilename, blocksize=1024*1024):
+    """Content hash of the whole file
+
+    Reading the file is much faster than parsing it, and a hash of only 
+    some blocks would miss values edited elsewhere in the file.
+
+    datafilename: the file to be hashed
+    blocksize: the number of bytes read at a time
+
+    returns: hex digest string
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(datafilename, 'rb') as fin:
+        for block in iter(lambda: fin.read(blocksize), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+##########################################
+#
+class ColumnFrame:
+    """Read-only set of equal length data columns, used instead of a pandas
+    dataframe for memory mapped columns, which pandas would copy into memory
+
+    The columns are accessed as frame[column], which returns the numpy 
+    array (or memmap) and len(frame) is the number of rows.
+    """
+
+    def __init__(self, data, columns=None):
+        """
+        data: dict with column name as key and numpy array as value
+        columns: optional list with the column order, default the dict order
+        """
+        self.data = data
+        self.columns = list(data) if columns is None else list(columns)
+
+    def __len__(self):
+        return len(self.data[self.columns[0]]) if self.columns else 0
+
+    def __getitem__(self, column):
+        return self.data[column]
+
+##########################################
+#
+class DataCache:
+    """On-disk cache of parsed data files, one .npy file per column
+
+    Each cached data file is stored in its own folder in cachedir, named
+    by the hash of the data file's absolute path.  The folder contains a
+    meta.json file with the data file size, mtime, content digest and
+    column names, and one .npy file per column.
+
+    The statistics of the columns (see channelstats.py) can be kept in 
+    meta.json with the entry.
+
+    An entry is valid if the data file size and mtime are unchanged.  If
+    only the mtime changed (e.g., the file was touched or copied again), 
+    the entry is valid if the digest of the whole content is unchanged.
+    The least recently used entries are removed when the total cache size
+    exceeds maxsize bytes.
+
+    Several processes (e.g., WSGI workers) can share the cache.  A new 
+    entry is written to a .tmp<pid> folder, meta.json last, and then 
+    replaced at once.  Replacing, loading and removing an entry is done 
+    holding the entry's lock file (<entry>.lock in cachedir).  An entry 
+    with a missing or unreadable column file is a cache miss, it is 
+    replaced by the next store.
+    """
+
+    def __init__(self, cachedir, maxsize=2*1024**3):
+        """Open (and create if necessary) the cache folder
+
+        cachedir: folder where the cached data are stored
+        maxsize: the maximum total size in bytes of all cache entries
+        """
+        self.cachedir = cachedir
+        self.maxsize = maxsize
+        # the entries loaded or stored by this process, not evicted
+        self.used = set()
+        if not os.path.exists(cachedir):
+            os.makedirs(cachedir, exist_ok=True)
+
+    def entryDir(self, datafilename):
+        """The cache folder for a data file
+        """
+        key = hashlib.blake2b(os.path.abspath(datafilename).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cachedir, key)
+
+    @contextmanager
+    def entryLock(self, entrydir):
+        """Hold the lock of a cache entry, waiting for other processes and threads
+        """
+        with open(entrydir + '.lock', 'a+b') as lockfile:
+            if fcntl is not None:
+                fcntl.flock(lockfile.fileno(), fcntl.LOCK_EX)
+            else:
+                lockfile.seek(0)
+                while True:
+                    try:
+                        # retries for 10 s before it fails
+                        msvcrt.locking(lockfile.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lockfile.fileno(), fcntl.LOCK_UN)
+                else:
+                    lockfile.seek(0)
+                    msvcrt.locking(lockfile.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def readMeta(self, entrydir):
+        try:
+            with open(os.path.join(entrydir, 'meta.json'), 'r') as fin:
+                return json.load(fin)
+        except (OSError, ValueError):
+            return None
+
+    def writeMeta(self, entrydir, meta):
+        # replace the file at once, other processes may be reading it
+        tmpname = os.path.join(entrydir, f'meta.json.tmp{os.getpid()}')
+        with open(tmpname, 'w') as fout:
+            json.dump(meta, fout)
+        os.replace(tmpname, os.path.join(entrydir, 'meta.json'))
+
+    def isValid(self, datafilename, meta, variant):
+        """Check if a cache entry still matches the data file
+        """
+        if meta is None or meta['variant'] != variant:
+            return False
+        stat = os.stat(datafilename)
+        if stat.st_size != meta['size']:
+            return False
+        if stat.st_mtime == meta['mtime']:
+            return True
+        # the file was touched, but the contents may be the same
+        return fileDigest(datafilename) == meta['digest']
+
+    def has(self, datafilename, variant='', usecols=None):
+        """Check if a data file is in the cache, up to date and with the required columns
+        """
+        meta = self.readMeta(self.entryDir(datafilename))
+        if not self.isValid(datafilename, meta, variant):
+            return False
+        return usecols is None or set(usecols).issubset(meta['columns'])
+
+    def load(self, datafilename, variant='', usecols=None, mmap=False):
+        """Load a data file from the cache
+
+        datafilename: the original data file name
+        variant: string describing the load options (e.g., dtype) of the entry
+        usecols: optional list of the column names required, default all cached columns
+        mmap: if True memory map the column files (read only) into a ColumnFrame
+
+        returns: pandas dataframe (ColumnFrame if mmap) or None if not in the cache, 
+                 out of date or if not all the required columns are cached
+        """
+        entrydir = self.entryDir(datafilename)
+        with self.entryLock(entrydir):
+            meta = self.readMeta(entrydir)
+            if not self.isValid(datafilename, meta, variant):
+                return None
+
+            if usecols is not None and not set(usecols).issubset(meta['columns']):
+                return None
+            # keep the column order of the data file
+            columns = [column for column in meta['columns'] if usecols is None or column in usecols]
+
+            data = {}
+            try:
+                for column in columns:
+                    i = meta['columns'].index(column)
+                    data[column] = np.load(os.path.join(entrydir, f'c{i:05d}.npy'), 
+                                           mmap_mode='r' if mmap else None)
+            except (OSError, ValueError):
+                # e.g., a column file removed by hand, parse the data file again
+                return None
+
+            # update the access time for the eviction and the touched mtime
+            meta['lastused'] = time.time()
+            meta['mtime'] = os.stat(datafilename).st_mtime
+            self.writeMeta(entrydir, meta)
+            self.used.add(entrydir)
+
+        if mmap:
+            return ColumnFrame(data, columns)
+        return pd.DataFrame(data, columns=columns)
+
+    def store(self, datafilename, df, variant=''):
+        """Write a parsed data file to the cache
+
+        datafilename: the original data file name
+        df: the pandas dataframe read from the data file
+        variant: string describing the load options (e.g., dtype) of the entry
+        """
+        entrydir = self.entryDir(datafilename)
+        tmpdir = entrydir + f'.tmp{os.getpid()}'
+        if os.path.exists(tmpdir):
+            shutil.rmtree(tmpdir)
+        os.makedirs(tmpdir)
+
+        nbytes = 0
+        for i, column in enumerate(df.columns):
+            values = np.ascontiguousarray(df[column].values)
+            np.save(os.path.join(tmpdir, f'c{i:05d}.npy'), values, allow_pickle=False)
+            nbytes = nbytes + values.nbytes
+
+        stat = os.stat(datafilename)
+        meta = {'path': os.path.abspath(datafilename),
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
+                'digest': fileDigest(datafilename),
+                'variant': variant,
+                'columns': [str(column) for column in df.columns],
+                'nbytes': nbytes,
+                'lastused': time.time(),
+                }
+        # meta.json last, a folder without it is not an entry
+        self.writeMeta(tmpdir, meta)
+
+        # replace the previous entry, if any
+        with self.entryLock(entrydir):
+            try:
+                if os.path.exists(entrydir):
+                    shutil.rmtree(entrydir)
+                os.replace(tmpdir, entrydir)
+                self.used.add(entrydir)
+            except OSError:
+                # e.g., the previous entry is memory mapped by another process (Windows)
+                shutil.rmtree(tmpdir, ignore_errors=True)
+
+    def loadStats(self, datafilename, variant=''):
+        """The column statistics kept with a data file's cache entry
+
+        returns: dict with the column name (or derived channel expression) as key 
+                 and the summary dict as value, empty if none kept or the entry 
+                 is out of date
+        """
+        meta = self.readMeta(self.entryDir(datafilename))
+        if not self.isValid(datafilename, meta, variant):
+            return {}
+        return meta.get('stats', {})
+
+    def storeStats(self, datafilename, stats, variant=''):
+        """Keep column statistics with a data file's cache entry, if it is up to date
+
+        stats: dict with the column name (or derived channel expression) as key
+               and the summary dict as value, merged with those kept
+        """
+        entrydir = self.entryDir(datafilename)
+        with self.entryLock(entrydir):
+            meta = self.readMeta(entrydir)
+            if not self.isValid(datafilename, meta, variant):
+                return
+            meta.setdefault('stats', {}).update(stats)
+            self.writeMeta(entrydir, meta)
+
+    def evict(self, tmpAge=3600.):
+        """Remove the least recently used entries until the cache fits in maxsize
+
+        The entries used by this process are kept.  The .tmp<pid> folders
+        being written by other processes are kept, those older than tmpAge
+        seconds are left over from a crashed process and are removed.
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.cachedir):
+            entrydir = os.path.join(self.cachedir, name)
+            if not os.path.isdir(entrydir):
+                # the lock files
+                continue
+            if '.tmp' in name:
+                try:
+                    if time.time() - os.path.getmtime(entrydir) > tmpAge:
+                        shutil.rmtree(entrydir, ignore_errors=True)
+                except OSError:
+                    pass
+                continue
+            meta = self.readMeta(entrydir)
+            if meta is None:
+                # incomplete entry (e.g., a removal that failed), a store holds the lock
+                with self.entryLock(entrydir):
+                    if self.readMeta(entrydir) is None:
+                        shutil.rmtree(entrydir, ignore_errors=True)
+                continue
+            total = total + meta['nbytes']
+            if entrydir not in self.used:
+                entries.append((meta['lastused'], meta['nbytes'], entrydir))
+
+        for lastused, nbytes, entrydir in sorted(entries):
+            if total <= self.maxsize:
+                break
+            with self.entryLock(entrydir):
+                shutil.rmtree(entrydir, ignore_errors=True)
+            total = total - nbytes
+
+##########################################
+#
+class TailReader:
+    """Incremental reader for a text data file that is being appended to
+
+    The reader remembers the byte offset of the first unread row.  Each read
+    parses only the complete rows appended since the previous read and 
+    appends them to preallocated column buffers, which are doubled in size 
+    when full.  A partly written last row is left for the next read.  If the
+    file became shorter it was restarted and is read again from the start.
+
+    The columns are accessed as reader[column], which returns a numpy view
+    of the rows read so far, and len(reader) is the number of rows read.
+    """
+
+    def __init__(self, datafilename, usecols=None, dtype=None, capacity=65536):
+        """Set up the reader, the file is only read by read()
+
+        datafilename: the file to be read
+        usecols: optional list of the column names to be read, default read all
+        dtype: optional dtype (or dict of column:dtype) passed to the parser
+        capacity: the initial number of rows in the column buffers
+        """
+        self.datafilename = datafilename
+        self.usecols = None if usecols is None else set(usecols)
+        self.dtype = dtype
+        self.capacity = capacity
+        self.reset()
+
+    def reset(self):
+        """Forget all rows read, the next read starts at the beginning of the file
+        """
+        self.offset = 0
+        self.size = 0
+        self.length = 0
+        self.sep = None
+        self.names = None
+        self.columns = []
+        self.buffers = {}
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, column):
+        return self.buffers[column][:self.length]
+
+    def setHeader(self, header):
+        """Determine the separator and the column names from the header line
+        """
+        self.sep = sniffSeparator(self.datafilename)
+        self.names = re.split(self.sep or regexSeparator, header.strip())
+        self.columns = [name for name in self.names if self.usecols is None or name in self.usecols]
+
+    def read(self):
+        """Parse the rows appended to the file since the previous read
+
+        returns: the number of new rows
+        """
+        size = os.path.getsize(self.datafilename)
+        if size < self.size:
+            # the file was truncated or replaced, start again
+            self.reset()
+        self.size = size
+        if size <= self.offset:
+            return 0
+
+        with open(self.datafilename, 'rb') as fin:
+            fin.seek(self.offset)
+            if self.names is None:
+                header = fin.readline()
+                if not header.endswith(b'\n'):
+                    # the header line is still being written
+                    return 0
+                self.offset = self.offset + len(header)
+                self.setHeader(header.decode(errors='replace'))
+            text = fin.read(size - self.offset)
+
+        # only complete rows, a partly written row is read next time
+        end = text.rfind(b'\n') + 1
+        if end == 0:
+            return 0
+        self.offset = self.offset + end
+
+        if self.sep is None:
+            df = pd.read_csv(io.BytesIO(text[:end]), sep=regexSeparator, header=None, names=self.names,
+                             usecols=self.columns, index_col=None, engine='python', dtype=self.dtype)
+        else:
+            df = pd.read_csv(io.BytesIO(text[:end]), sep=self.sep, header=None, names=self.names,
+                             usecols=self.columns, index_col=None, engine='c', dtype=self.dtype)
+        self.append(df)
+        return df.shape[0]
+
+    def append(self, df):
+        """Append the rows in a dataframe to the column buffers
+        """
+        needed = self.length + df.shape[0]
+        for column in self.columns:
+            values = df[column].values
+            buffer = self.buffers.get(column, None)
+
+            capacity = self.capacity if buffer is None else buffer.shape[0]
+            while capacity < needed:
+                capacity = 2 * capacity
+            dtype = values.dtype if buffer is None else np.result_type(buffer.dtype, values.dtype)
+
+            if buffer is None or capacity != buffer.shape[0] or dtype != buffer.dtype:
+                # views returned earlier keep the previous buffer
+                grown = np.empty(capacity, dtype=dtype)
+                if buffer is not None:
+                    grown[:self.length] = buffer[:self.length]
+                buffer = grown
+            buffer[self.length:needed] = values
+            self.buffers[column] = buffer
+
+        # the new rows are only visible once all the columns are filled
+        self.length = needed
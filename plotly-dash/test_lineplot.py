@@ -0,0 +1,66 @@
+"""
+Tests for the figures built by pyqt-dash-lineplot.py, run with pytest
+on the bundled config and data files.
+"""
+
+import os
+import sys
+import importlib.util
+
+import pytest
+
+folder = os.path.dirname(os.path.abspath(__file__))
+
+##########################################
+#
+@pytest.fixture(scope='module')
+def lineplot():
+    """The pyqt-dash-lineplot.py script as module, with the bundled config and data loaded
+    """
+    # the config refers to the data files relative to this folder
+    cwd = os.getcwd()
+    os.chdir(folder)
+    try:
+        spec = importlib.util.spec_from_file_location('pyqt_dash_lineplot',
+                                                      os.path.join(folder, 'pyqt-dash-lineplot.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['pyqt_dash_lineplot'] = module
+        spec.loader.exec_module(module)
+        module.loadConfig('pyqt-dash-config.xlsx')
+        module.loadData(None)
+        module.prepareGraphs()
+        yield module
+    finally:
+        os.chdir(cwd)
+
+##########################################
+#
+def test_webgl_default(lineplot):
+    # the .rgeo lines are longer than the default MaxPoints
+    sheet = lineplot.graphSheets['graph-RelativePosition']
+    figdict = lineplot.makeFigure(sheet, sheet.graphs[0])[0]
+    for line in figdict['data']:
+        assert len(line['x']) == lineplot.defaultMaxPoints
+        assert line['type'] == 'scattergl'
+
+##########################################
+#
+def test_svg_short_lines(lineplot):
+    # the .traj lines are shorter than the default WebGLPoints
+    sheet = lineplot.graphSheets['graph-MissilePosition']
+    figdict = lineplot.makeFigure(sheet, sheet.graphs[0])[0]
+    for line in figdict['data']:
+        assert len(line['x']) <= lineplot.defaultWebGLPoints
+        assert 'type' not in line
+
+##########################################
+#
+def test_disk_graphs(lineplot, tmp_path, monkeypatch):
+    # the html files are written by writeDiskGraphs, not when a tab is built
+    monkeypatch.chdir(tmp_path)
+    lineplot.getGraphSet(0)
+    assert not list(tmp_path.glob('*.html'))
+    lineplot.writeDiskGraphs()
+    toDisk = [sheet for sheet in lineplot.graphSheets.values() if sheet.value('ToDisk', True)]
+    assert len(list(tmp_path.glob('*.html'))) == sum(len(sheet.graphs) for sheet in toDisk)
+    assert (tmp_path / 'plotly.min.js').exists()
@@ -0,0 +1,98 @@
+"""
+Tests for the decimation functions in tracetools.py, run with pytest.
+"""
+
+import numpy as np
+import pytest
+
+from tracetools import minmaxIndices, decimateIndices, lttbIndices, m4Indices
+
+##########################################
+#
+def gapLine(numSamples=20000, gap=(5000, 9000)):
+    """A sine line with a gap of NaN samples, longer than the point budget
+    """
+    x = np.arange(numSamples, dtype=float)
+    y = np.sin(x / 100.)
+    y[gap[0]:gap[1]] = np.nan
+    return x, y
+
+##########################################
+#
+def test_minmax_all_nan_buckets():
+    x, y = gapLine()
+    indices = minmaxIndices(x, y, 1000)
+
+    assert len(indices) <= 1000
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    # the finite samples still give the envelope
+    assert np.nanmin(y[indices]) == np.nanmin(y)
+    assert np.nanmax(y[indices]) == np.nanmax(y)
+    # the gap is kept, with its edges
+    assert np.isnan(y[indices]).any()
+
+##########################################
+#
+def test_minmax_all_nan_rest():
+    # the samples after the last full bucket are all NaN
+    x, y = gapLine(numSamples=10007, gap=(10000, 10007))
+    indices = minmaxIndices(x, y, 1000)
+    assert indices[-1] == len(y) - 1
+
+##########################################
+#
+def test_minmax_all_nan_line():
+    x = np.arange(10000, dtype=float)
+    y = np.full(10000, np.nan)
+    indices = minmaxIndices(x, y, 1000)
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+
+##########################################
+#
+@pytest.mark.parametrize('mode', ['lttb', 'minmax', 'none'])
+def test_decimate_with_gap(mode):
+    x, y = gapLine()
+    indices = decimateIndices(x, y, 1000, mode)
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert np.all(np.diff(indices) > 0)
+
+##########################################
+#
+def lttbLoop(x, y, numPoints):
+    """Sequential largest-triangle-three-buckets, as reference
+    """
+    numSamples = len(x)
+    edges = np.linspace(1, numSamples - 1, numPoints - 1).astype(int)
+    counts = np.diff(edges)
+    cx = np.append(np.add.reduceat(x[1:-1], edges[:-1] - 1)[1:] / counts[1:], x[-1])
+    cy = np.append(np.add.reduceat(y[1:-1], edges[:-1] - 1)[1:] / counts[1:], y[-1])
+    a = 0
+    indices = [0]
+    for i in range(numPoints - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - cx[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy[i] - y[a]))
+        a = lo + np.argmax(area)
+        indices.append(a)
+    indices.append(numSamples - 1)
+    return np.array(indices)
+
+##########################################
+#
+@pytest.mark.parametrize('numSamples', [1200, 2500, 4000])
+def test_lttb_small_buckets(numSamples):
+    # the vectorized selection gives the same samples as the sequential algorithm
+    rng = np.random.default_rng(numSamples)
+    x = np.sort(rng.random(numSamples))
+    y = rng.standard_normal(numSamples)
+    assert np.array_equal(lttbIndices(x, y, 1000), lttbLoop(x, y, 1000))
+
+##########################################
+#
+def test_lttb_large_buckets():
+    x, y = gapLine(numSamples=1000003)
+    indices = lttbIndices(x, y, 1000)
+    assert len(indices) == 1000
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert np.all(np.diff(indices) > 0)
+    # selected from the first, last, minimum and maximum samples of the buckets
+    assert np.isin(indices, m4Indices(y, 999)).all()
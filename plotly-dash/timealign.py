@@ -0,0 +1,177 @@
+"""
+Time alignment of the lines from data files sampled at different rates,
+for the graphs of pyqt-dash-lineplot.py.
+
+A graph sheet plots its lines against the x column of its Datafile.  A
+line from another data file (e.g., a .gmbl file next to a .traj file) is
+aligned onto that time base: for each sample of the sheet's x column the
+line's value is taken from its own data file at the same time.
+
+An Alignment is computed once for a pair of time columns with one binary
+search (np.searchsorted) of all the target times in the source times,
+and is then applied to any number of columns of the source file with
+numpy indexing, without python loops over the samples:
+
+nearest: the source sample closest in time.
+
+linear: linear interpolation between the source samples before and after,
+the same values as np.interp.
+
+hold: the last source sample at or before the time (zero-order hold).
+
+Target times outside the source time range are NaN, the values are not
+extrapolated.  Source time columns that are not sorted are sorted first.
+
+When rows are appended to the data files (followed files), extend aligns
+only the new target rows and the target rows after the previous end of 
+the source times, as long as the source times stay sorted.
+
+This module requires numpy.
+"""
+
+import numpy as np
+
+from tracetools import growBuffer
+
+# alignment methods, the first one is the default
+methods = ['linear', 'nearest', 'hold']
+
+##########################################
+#
+class Alignment:
+    """Maps the samples of a source time column onto a target time column
+
+    tsource: the source file's time values as numpy array
+    ttarget: the target (graph) time values as numpy array
+    method: 'linear', 'nearest' or 'hold'
+    """
+
+    def __init__(self, tsource, ttarget, method='linear'):
+        if method not in methods:
+            raise ValueError(f'Unknown alignment method {method}, use one of {", ".join(methods)}')
+        self.method = method
+        tsource = np.asarray(tsource, dtype=float)
+        ttarget = np.asarray(ttarget, dtype=float)
+        self.sourceLength = len(tsource)
+        self.targetLength = len(ttarget)
+
+        # the source samples in time order
+        self.order = None
+        if not np.all(tsource[1:] >= tsource[:-1]):
+            self.order = np.argsort(tsource, kind='stable')
+
+        self.index0, self.index1, self.weight, self.valid = self.align(tsource, ttarget)
+
+        # the target rows that samples appended to the source may still change
+        self.pending = np.arange(0)
+        if self.sourceLength > 0 and self.order is None:
+            self.pending = np.nonzero(ttarget >= tsource[-1])[0]
+
+    def align(self, tsource, ttarget):
+        """The source samples and weights for target times
+
+        tsource: the source time values as numpy array
+        ttarget: the target time values to align as numpy array
+
+        returns: (index0, index1, weight, valid) numpy arrays, weight is None 
+                 if not interpolated
+        """
+        numSource = len(tsource)
+        numTarget = len(ttarget)
+        if numSource == 0:
+            index = np.zeros(numTarget, dtype=np.int64)
+            weight = np.zeros(numTarget) if self.method == 'linear' else None
+            return index, index.copy(), weight, np.zeros(numTarget, dtype=bool)
+
+        if self.order is not None:
+            tsource = tsource[self.order]
+
+        # the source samples at or before and after each target time
+        after = np.searchsorted(tsource, ttarget, side='right')
+        before = np.clip(after - 1, 0, numSource - 1)
+        after = np.clip(after, 0, numSource - 1)
+        valid = (ttarget >= tsource[0]) & (ttarget <= tsource[-1])
+
+        weight = None
+        if self.method == 'hold':
+            index0 = before
+        elif self.method == 'nearest':
+            index0 = np.where(ttarget - tsource[before] <= tsource[after] - ttarget, before, after)
+        else:
+            index0 = before
+            span = tsource[after] - tsource[before]
+            weight = np.divide(ttarget - tsource[before], span,
+                               out=np.zeros(numTarget), where=span > 0)
+        index1 = after
+
+        # indices into the source columns in file order
+        if self.order is not None:
+            index0 = self.order[index0]
+            index1 = self.order[index1]
+        return index0, index1, weight, valid
+
+    def extend(self, tsource, ttarget):
+        """Extend the alignment to the rows appended to the time columns
+
+        Only the new target rows and the target rows at or after the previous 
+        last source time are aligned again, the other target rows keep their 
+        source samples if the appended source times are in order.
+
+        tsource: all the source time values as numpy array
+        ttarget: all the target time values as numpy array
+
+        returns: numpy array with the target rows aligned again, or None if 
+                 the alignment must be computed again (the source times are not 
+                 sorted, or the columns became shorter)
+        """
+        tsource = np.asarray(tsource, dtype=float)
+        ttarget = np.asarray(ttarget, dtype=float)
+        numSource = len(tsource)
+        numTarget = len(ttarget)
+        if (self.order is not None or self.sourceLength == 0 
+                or numSource < self.sourceLength or numTarget < self.targetLength):
+            return None
+        appended = tsource[self.sourceLength - 1:]
+        if not np.all(appended[1:] >= appended[:-1]):
+            return None
+
+        rows = np.concatenate([self.pending, np.arange(self.targetLength, numTarget)])
+        index0, index1, weight, valid = self.align(tsource, ttarget[rows])
+
+        self.index0 = growBuffer(self.index0, self.targetLength, numTarget)
+        self.index1 = growBuffer(self.index1, self.targetLength, numTarget)
+        self.valid = growBuffer(self.valid, self.targetLength, numTarget)
+        self.index0[rows] = index0
+        self.index1[rows] = index1
+        self.valid[rows] = valid
+        if weight is not None:
+            self.weight = growBuffer(self.weight, self.targetLength, numTarget)
+            self.weight[rows] = weight
+
+        self.pending = rows[ttarget[rows] >= tsource[-1]]
+        self.sourceLength = numSource
+        self.targetLength = numTarget
+        return rows
+
+    def apply(self, values, rows=None):
+        """A source column aligned to the target time column
+
+        values: the source column as numpy array
+        rows: optional target rows to align (e.g., as returned by extend), 
+              default all
+
+        returns: float numpy array with one value per target time (or row)
+        """
+        values = np.asarray(values, dtype=float)
+        if rows is None:
+            rows = slice(0, self.targetLength)
+        if self.sourceLength == 0:
+            return np.full(self.targetLength, np.nan)[rows]
+
+        if self.weight is None:
+            aligned = values[self.index0[rows]]
+        else:
+            start = values[self.index0[rows]]
+            aligned = start + (values[self.index1[rows]] - start) * self.weight[rows]
+        aligned[~self.valid[rows]] = np.nan
+        return aligned
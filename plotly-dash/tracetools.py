@@ -0,0 +1,304 @@
+"""
+Decimation and zoom range selection of the lines of pyqt-dash-lineplot.py.
+
+Long telemetry lines are decimated on the server before being sent to the
+browser.  Two decimation modes are available:
+
+lttb: largest-triangle-three-buckets, keeps the visual shape of the line
+with the requested number of points.  Lines much longer than the number 
+of points are first reduced to the first, last, minimum and maximum 
+samples of one sub-bucket per point (M4), so that the cost of the 
+triangle selection depends on the number of points and the reduction 
+is a few passes of numpy over the samples.
+
+minmax: the minimum and maximum in each bucket, keeps the envelope of the line
+(all peaks) with the requested number of points.
+
+The decimation functions return the indices of the samples to keep, so that
+the same selection can be applied to the x and y arrays after scaling.
+When zooming, the samples in the zoomed x range are selected with
+rangeIndices before decimation.
+
+Arrays that grow with the rows appended to a followed data file are kept
+in buffers with room to spare, see growBuffer.
+
+This module requires numpy.
+"""
+
+import numpy as np
+
+##########################################
+#
+def lttbIndices(x, y, numPoints):
+    """Largest-triangle-three-buckets decimation
+
+    The first and last samples are always kept.  The remaining samples are
+    split into numPoints-2 buckets and the sample in each bucket forming the
+    largest triangle with the previously selected sample and the average of
+    the next bucket is selected.  For more than 4*numPoints samples the 
+    selection is made from the M4 samples (m4Indices) of numPoints-1 
+    buckets instead, an approximation that keeps the visual shape.
+
+    x: the x values as numpy array
+    y: the y values as numpy array
+    numPoints: the number of samples to keep
+
+    returns: numpy array with the indices of the samples to keep
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    numSamples = x.shape[0]
+    if numPoints >= numSamples or numPoints < 3:
+        return np.arange(numSamples)
+
+    # large buckets: select from the M4 samples of the buckets instead,
+    # so that the selection below has at most a few samples per bucket
+    if numSamples > 4 * numPoints:
+        reduced = m4Indices(y, numPoints - 1)
+        return reduced[lttbIndices(x[reduced], y[reduced], numPoints)]
+
+    # bucket edges for the samples between the first and the last
+    edges = np.linspace(1, numSamples - 1, numPoints - 1).astype(int)
+
+    # averages of each bucket, used as the third triangle corner
+    counts = np.diff(edges)
+    xavg = np.add.reduceat(x[1:-1], edges[:-1] - 1) / counts
+    yavg = np.add.reduceat(y[1:-1], edges[:-1] - 1) / counts
+
+    # the third corner for each bucket, the last bucket is followed by the last sample
+    cx = np.append(xavg[1:], x[-1])
+    cy = np.append(yavg[1:], y[-1])
+
+    indices = np.empty(numPoints, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = numSamples - 1
+
+    # small buckets: the python loop below costs more than the triangle areas
+    if counts.max() <= 8:
+        indices[1:-1] = lttbSmallBuckets(x, y, edges, cx, cy)
+        return indices
+
+    a = 0
+    for i in range(numPoints - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # twice the triangle area, the constant factor does not matter
+        area = np.abs((x[a] - cx[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy[i] - y[a]))
+        a = lo + np.argmax(area)
+        indices[i + 1] = a
+
+    return indices
+
+##########################################
+#
+def lttbSmallBuckets(x, y, edges, cx, cy):
+    """Vectorized largest-triangle-three-buckets for small buckets
+
+    The selection in each bucket depends only on the selection in the 
+    previous bucket, which is one of a few samples.  The selection for each
+    possible previous selection is computed for all buckets at once, and
+    the chain of selections is resolved by composing these tables in
+    log2(number of buckets) passes, doubling the composed length in each
+    pass.  The result is the same as the sequential algorithm's.
+
+    x: the x values as numpy array
+    y: the y values as numpy array
+    edges: the bucket edges
+    cx: the x value of the third corner for each bucket
+    cy: the y value of the third corner for each bucket
+
+    returns: numpy array with the selected index in each bucket
+    """
+    counts = np.diff(edges)
+    numBuckets = counts.shape[0]
+    width = counts.max()
+    bucket = edges[:-1, None] + np.arange(width)[None, :]
+    valid = bucket < edges[1:, None]
+    bucket = np.minimum(bucket, x.shape[0] - 1)
+
+    # the possible previous selections, the first bucket follows the first sample
+    previous = np.zeros_like(bucket)
+    previous[1:] = bucket[:-1]
+    ax = x[previous][:, :, None]
+    ay = y[previous][:, :, None]
+    xb = x[bucket][:, None, :]
+    yb = y[bucket][:, None, :]
+    area = np.abs((ax - cx[:, None, None]) * (yb - ay) - (ax - xb) * (cy[:, None, None] - ay))
+    area[~np.broadcast_to(valid[:, None, :], area.shape)] = -1.
+    # the selection in each bucket for each selection in the previous bucket
+    choice = np.argmax(area, axis=2)
+
+    span = 1
+    while span < numBuckets:
+        choice[span:] = np.take_along_axis(choice[span:], choice[:-span], axis=1)
+        span = 2 * span
+
+    return edges[:-1] + choice[:, 0]
+
+##########################################
+#
+def bucketExtremes(buckets):
+    """The indices of the minimum and maximum finite values in each bucket
+
+    Buckets without finite values (e.g., a gap of NaN samples) keep their
+    first and last samples instead.
+
+    buckets: 2D numpy array with one bucket per row
+
+    returns: (lows, highs) numpy arrays with the index in each bucket
+    """
+    lows = np.argmin(buckets, axis=1)
+    highs = np.argmax(buckets, axis=1)
+
+    # argmin and argmax select a NaN if there is one, search those buckets again
+    rows = np.arange(buckets.shape[0])
+    redo = np.nonzero(~np.isfinite(buckets[rows, lows]) | ~np.isfinite(buckets[rows, highs]))[0]
+    if redo.shape[0] > 0:
+        redoBuckets = buckets[redo]
+        finite = np.isfinite(redoBuckets)
+        redoLows = np.argmin(np.where(finite, redoBuckets, np.inf), axis=1)
+        redoHighs = np.argmax(np.where(finite, redoBuckets, -np.inf), axis=1)
+        empty = ~finite.any(axis=1)
+        redoLows[empty] = 0
+        redoHighs[empty] = buckets.shape[1] - 1
+        lows[redo] = redoLows
+        highs[redo] = redoHighs
+    return lows, highs
+
+##########################################
+#
+def m4Indices(y, numBuckets):
+    """The first, last, minimum and maximum samples of each bucket (M4)
+
+    The samples are split into numBuckets buckets of the same size, the
+    remaining samples are one more bucket.  Drawn with one pixel per bucket,
+    the selected samples give the same picture as all samples.
+
+    y: the y values as numpy array
+    numBuckets: the number of buckets
+
+    returns: numpy array with the sorted indices of the selected samples,
+             at most 4*(numBuckets+1)
+    """
+    numSamples = y.shape[0]
+    bucketSize = numSamples // numBuckets
+    numFull = numBuckets * bucketSize
+
+    offsets = np.arange(numBuckets) * bucketSize
+    indices = [offsets, offsets + bucketSize - 1]
+    indices.extend(offsets + extremes 
+                   for extremes in bucketExtremes(y[:numFull].reshape(numBuckets, bucketSize)))
+    if numFull < numSamples:
+        indices.append(np.array([numFull, numSamples - 1]))
+        indices.extend(numFull + extremes for extremes in bucketExtremes(y[numFull:].reshape(1, -1)))
+
+    return np.unique(np.concatenate(indices))
+
+##########################################
+#
+def minmaxIndices(x, y, numPoints):
+    """Min/max envelope decimation
+
+    The samples are split into (numPoints-4)/2 buckets and the minimum and
+    maximum samples in each bucket are kept, in the original order.  The
+    remaining samples and the first and last samples take up the other four.
+
+    x: the x values as numpy array (not used, for the same signature as lttbIndices)
+    y: the y values as numpy array
+    numPoints: the number of samples to keep
+
+    returns: numpy array with the indices of the samples to keep
+    """
+    y = np.asarray(y, dtype=float)
+    numSamples = y.shape[0]
+    numBuckets = (numPoints - 4) // 2
+    if numPoints >= numSamples or numBuckets < 1:
+        return np.arange(numSamples)
+
+    bucketSize = numSamples // numBuckets
+    numFull = numBuckets * bucketSize
+
+    buckets = y[:numFull].reshape(numBuckets, bucketSize)
+    offsets = np.arange(numBuckets) * bucketSize
+    indices = [offsets + extremes for extremes in bucketExtremes(buckets)]
+
+    # the remaining samples are added to the last bucket's selection
+    if numFull < numSamples:
+        rest = y[numFull:].reshape(1, -1)
+        indices.extend(numFull + extremes for extremes in bucketExtremes(rest))
+
+    # keep the first and last samples so that the x range is unchanged
+    indices.append(np.array([0, numSamples - 1]))
+
+    return np.unique(np.concatenate(indices))
+
+##########################################
+#
+def rangeIndices(x, xmin, xmax, isSorted=False):
+    """Select the samples with x values in a range
+
+    For sorted x a binary search is used and the result is a slice, 
+    including one sample beyond each end so that the line reaches the edges
+    of the range.  Otherwise all x values are compared with the range.
+
+    x: the x values as numpy array
+    xmin: the lower limit of the range
+    xmax: the upper limit of the range
+    isSorted: True if x is sorted in ascending order
+
+    returns: slice or numpy array with the indices in the range
+    """
+    if isSorted:
+        lo = max(np.searchsorted(x, xmin, side='left') - 1, 0)
+        hi = np.searchsorted(x, xmax, side='right') + 1
+        return slice(lo, hi)
+    return np.nonzero((x >= xmin) & (x <= xmax))[0]
+
+##########################################
+#
+def growBuffer(buffer, length, numRows, dtype=None):
+    """A buffer with room for numRows rows, keeping its first length rows
+
+    The buffer is doubled in size until it is large enough, so that appending 
+    rows costs in proportion to the new rows on average.  A new buffer is 
+    only allocated if the buffer is too small or its dtype cannot hold the
+    new rows, views returned earlier then keep the previous buffer.
+
+    buffer: numpy array
+    length: the number of rows in use
+    numRows: the number of rows needed
+    dtype: optional dtype of the new rows, default the buffer's
+
+    returns: numpy array with at least numRows rows
+    """
+    dtype = buffer.dtype if dtype is None else np.result_type(buffer.dtype, dtype)
+    capacity = max(buffer.shape[0], 1)
+    if capacity >= numRows and dtype == buffer.dtype and buffer.flags.writeable:
+        return buffer
+    while capacity < numRows:
+        capacity = 2 * capacity
+    grown = np.empty(capacity, dtype=dtype)
+    grown[:length] = buffer[:length]
+    return grown
+
+##########################################
+#
+decimators = {
+    'lttb': lttbIndices,
+    'minmax': minmaxIndices,
+}
+
+##########################################
+#
+def decimateIndices(x, y, numPoints, mode='lttb'):
+    """Select the samples to keep for a line with at most numPoints samples
+
+    x: the x values as numpy array
+    y: the y values as numpy array
+    numPoints: the maximum number of samples to keep
+    mode: 'lttb', 'minmax' or 'none'
+
+    returns: numpy array with the indices of the samples to keep
+    """
+    if mode == 'none' or numPoints is None or len(x) <= numPoints:
+        return np.arange(len(x))
+    return decimators[mode](x, y, numPoints)
@@ -0,0 +1,66 @@
+"""
+The PyQt browser window and the first request report of the pyqt-dash scripts.
+
+Both scripts serve their page with Dash in a background thread and show
+it in a QtWebEngine browser window in the main thread, or with --headless
+only serve it.  reportFirstRequest prints the startup time until the 
+browser's first request, in both cases.
+
+This module requires PyQt5, imported by runViewer only.
+"""
+
+import sys
+import time
+
+##########################################
+#
+def runViewer(port):
+    """Show the served page in a PyQt browser window until it is closed
+
+    PyQt5 is only imported here, so that --headless does not need it.
+
+    port: port number of the served page
+
+    returns: the Qt application exit code
+    """
+    from PyQt5 import QtWidgets
+    import PyQt5.QtCore as QtCore
+    from PyQt5 import QtWebEngineWidgets
+
+    # creates a browser widget
+    class WebViewer(QtWebEngineWidgets.QWebEngineView):
+        def __init__(self, parent, url):
+            """Create a web browser widget
+
+            parent: the parent GUI element where this is included.
+            url: the url to be browsed
+            """
+            super().__init__(parent)
+            page = QtWebEngineWidgets.QWebEnginePage(self)
+            self.setPage(page)
+            self.setUrl(QtCore.QUrl(url))
+
+    # start main app with the widget rendering what is available on the port
+    appMain = QtWidgets.QApplication(sys.argv + ["--disable-web-security"])
+    main_widget = QtWidgets.QWidget(None)
+    window_layout = QtWidgets.QVBoxLayout(main_widget)
+    window_layout.addWidget(WebViewer(main_widget,f'http://127.0.0.1:{port}'))
+    main_widget.show()
+
+    return appMain.exec_()
+
+##########################################
+#
+def reportFirstRequest(app, tstart):
+    """Print the time from tstart to the first request served by the app
+
+    app: the Dash app
+    tstart: time.perf_counter() at startup
+    """
+    reported = []
+
+    @app.server.before_request
+    def firstRequest():
+        if not reported:
+            reported.append(True)
+            print(f'First request after {time.perf_counter() - tstart:.3f} s')
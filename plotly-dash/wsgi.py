@@ -0,0 +1,124 @@
+"""
+
+WSGI entry point for serving the Dash portal with a production server.
+
+The pyqt-dash scripts run the Flask development server in a thread next to
+the PyQt browser, which serves one request at a time.  For several users
+at the same time, serve the portal with a WSGI server and several worker
+processes, e.g., with gunicorn (Linux):
+
+    gunicorn --preload --workers 8 --bind 0.0.0.0:8050 wsgi:server
+
+or with waitress (also on Windows, threads instead of processes):
+
+    waitress-serve --threads 16 --listen *:8050 wsgi:server
+
+The config and data files are loaded once, when this module is imported.
+With gunicorn --preload this is done before the worker processes are
+forked, so that the workers share the loaded data pages (copy on write)
+instead of each loading its own copy.  Without --preload, use
+DASH_MMAP=1 so that the workers memory map the same column files from
+the cache (the first worker parses the files, the others load them from
+the cache).
+
+Each worker builds the tabs and figures it serves.  The figure urls
+include the graph name, so that any worker can serve the figure JSON
+of a tab built by another worker.
+
+The portal and its options are set with environment variables:
+
+    DASH_PORTAL      lineplot (pyqt-dash-lineplot.py, default) or csv (pyqt-dash-csv.py)
+    DASH_CONFIGFILE  Excel config filename [default: ./pyqt-dash-config.xlsx,
+                     data/pyqt-dash-config.xlsx for csv]
+    DASH_CACHEDIR    Folder for the parsed data cache, empty for no cache [default: ./.dashcache]
+    DASH_CACHESIZE   Maximum size of the parsed data cache in MB [default: 2048]
+    DASH_TABCACHE    Number of built tabs kept in memory per worker [default: 8]
+    DASH_MMAP        1 to memory map the data columns from the cache [default: 0]
+    DASH_WORKERS     Number of data files loaded at the same time, 0 for the number of CPUs [default: 1]
+                     (a process pool, in each gunicorn worker without --preload)
+
+The --watch and --follow options of pyqt-dash-lineplot.py are not
+available here, each worker process would reload the files on its own.
+The html files of the ToDisk graph sheets are written at startup.
+PyQt5 is not needed.
+"""
+
+import os
+import sys
+import time
+import importlib.util
+
+##########################################
+#
+def loadScript(filename, name):
+    """Import a pyqt-dash script (the file names are not valid module names)
+
+    filename: the script filename in this folder
+    name: the module name to register the script under
+
+    returns: the module
+    """
+    pathname = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    spec = importlib.util.spec_from_file_location(name, pathname)
+    module = importlib.util.module_from_spec(spec)
+    # dash looks up the module to find the assets folder
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+##########################################
+#
+def lineplotApp():
+    """Load the config and data files and create the pyqt-dash-lineplot.py app
+
+    returns: the Dash app
+    """
+    lineplot = loadScript('pyqt-dash-lineplot.py', 'pyqt_dash_lineplot')
+    from telemetryio import DataCache
+
+    lineplot.maxGraphSets = max(1, int(os.environ.get('DASH_TABCACHE', '8')))
+
+    cachedir = os.environ.get('DASH_CACHEDIR', './.dashcache')
+    cache = None
+    if cachedir:
+        cache = DataCache(cachedir,
+                          maxsize=int(float(os.environ.get('DASH_CACHESIZE', '2048')) * 1024**2))
+
+    lineplot.useMmap = os.environ.get('DASH_MMAP', '0') not in ('', '0')
+    if lineplot.useMmap and cache is None:
+        print('DASH_MMAP requires the cache, the data files will be loaded')
+        lineplot.useMmap = False
+
+    lineplot.loadConfig(os.environ.get('DASH_CONFIGFILE', './pyqt-dash-config.xlsx'))
+    workers = int(os.environ.get('DASH_WORKERS', '1')) or os.cpu_count()
+    lineplot.loadData(cache, workers=workers)
+    lineplot.prepareGraphs()
+    # at startup, a writer thread holding graphLock while the workers are forked would block them
+    lineplot.writeDiskGraphs()
+
+    return lineplot.createApp(lineplot.makePage())
+
+##########################################
+#
+def csvApp():
+    """Load the config and data files and create the pyqt-dash-csv.py app
+
+    returns: the Dash app
+    """
+    csv = loadScript('pyqt-dash-csv.py', 'pyqt_dash_csv')
+    pageLayout = csv.makePageFromCVS(os.environ.get('DASH_CONFIGFILE', 'data/pyqt-dash-config.xlsx'))
+    return csv.createApp(pageLayout)
+
+##########################################
+#
+portals = {
+    'lineplot': lineplotApp,
+    'csv': csvApp,
+}
+
+tstart = time.perf_counter()
+app = portals[os.environ.get('DASH_PORTAL', 'lineplot')]()
+print(f'Startup (config, data and page) took {time.perf_counter() - tstart:.3f} s')
+
+# the Flask WSGI app
+server = app.server